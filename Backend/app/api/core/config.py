@@ -5,9 +5,78 @@ load_dotenv()
 
 class Settings:
     environment: str = os.getenv("ENVIRONMENT", "development")
+    # uvicorn worker processes (uvicorn reads the same variable for --workers)
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "1"))
     openai_api_key: str | None = os.getenv("OPENAI_API_KEY") or None
+    openai_api_base: str | None = os.getenv("OPENAI_API_BASE") or None
     gemini_api_key: str | None = os.getenv("GEMINI_API_KEY") or None
     gemini_api_base: str | None = os.getenv("GEMINI_API_BASE") or "https://generativelanguage.googleapis.com/v1"
     claudia_api_key: str | None = os.getenv("CLAUDIA_API_KEY") or None
 
-settings = Settings()
\ No newline at end of file
+    # shared HTTP connection pool used by every provider SDK client
+    llm_max_connections: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    llm_max_keepalive_connections: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    llm_keepalive_expiry: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+    llm_timeout: float = float(os.getenv("LLM_TIMEOUT", "60"))
+    # max in-flight requests per provider
+    openai_max_concurrency: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+    gemini_max_concurrency: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+    # per-model token buckets; 0 disables, LLM_RATE_LIMITS is JSON {"model": {"rpm": .., "tpm": ..}}.
+    # Limits are for the whole box; each of WEB_CONCURRENCY workers enforces its share
+    llm_default_rpm: float = float(os.getenv("LLM_DEFAULT_RPM", "0"))
+    llm_default_tpm: float = float(os.getenv("LLM_DEFAULT_TPM", "0"))
+    llm_rate_limits: str | None = os.getenv("LLM_RATE_LIMITS") or None
+    # retries with jittered exponential backoff, per-attempt timeout and overall deadline (seconds)
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    llm_retry_base_delay: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    llm_retry_max_delay: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+    llm_attempt_timeout: float = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "60"))
+    llm_deadline: float = float(os.getenv("LLM_DEADLINE", "180"))
+    # hedging: fire a duplicate request once a call outlives this latency quantile
+    llm_hedge: bool = os.getenv("LLM_HEDGE", "0").lower() in ("1", "true", "yes")
+    llm_hedge_quantile: float = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+    llm_hedge_min_samples: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    # Gemini explicit context caching of the stable prompt prefix callers mark with `prefix=`;
+    # prefixes under the model's minimum cacheable size are sent uncached
+    gemini_context_cache: bool = os.getenv("GEMINI_CONTEXT_CACHE", "0").lower() in ("1", "true", "yes")
+    gemini_cache_min_tokens: int = int(os.getenv("GEMINI_CACHE_MIN_TOKENS", "1024"))
+    gemini_cache_ttl: float = float(os.getenv("GEMINI_CACHE_TTL", "3600"))
+
+    # server-side "run to completion" worker pool
+    runner_workers: int = int(os.getenv("DEBATE_RUNNER_WORKERS", "8"))
+    runner_queue_size: int = int(os.getenv("DEBATE_RUNNER_QUEUE_SIZE", "10000"))
+    # a queued/running status not renewed by its worker for this long counts as failed
+    runner_lease: float = float(os.getenv("DEBATE_RUNNER_LEASE", "30"))
+
+    # session persistence: memory:// or sqlite:///path/to/sessions.db; workers only share the latter
+    session_store_url: str = os.getenv("SESSION_STORE_URL") or ("memory://" if web_concurrency <= 1 else "sqlite:///sessions.db")
+    session_ttl: float = float(os.getenv("SESSION_TTL", "86400"))  # idle seconds, 0 disables expiry
+    session_max: int = int(os.getenv("SESSION_MAX", "10000"))  # in-memory store only
+
+    # prompt context policy: full | last_k | token_budget | summary (see services/context_policy.py)
+    context_policy: str = os.getenv("CONTEXT_POLICY", "full")
+    context_last_k: int = int(os.getenv("CONTEXT_LAST_K", "6"))
+    context_token_budget: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+    context_summary_model: str = os.getenv("CONTEXT_SUMMARY_MODEL", "gpt-4o-mini")
+    context_summary_max_tokens: int = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "300"))
+
+    # LLM response cache: on by default for temperature=0 calls, opt-in for sampled ones
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    llm_cache_ttl: float = float(os.getenv("LLM_CACHE_TTL", "3600"))
+    llm_cache_path: str | None = os.getenv("LLM_CACHE_PATH") or None  # SQLite file for the on-disk tier
+
+    # tournaments: debates played at once and the largest accepted bracket
+    tournament_concurrency: int = int(os.getenv("TOURNAMENT_CONCURRENCY", "16"))
+    tournament_max_concurrency: int = int(os.getenv("TOURNAMENT_MAX_CONCURRENCY", "64"))
+    tournament_max_matches: int = int(os.getenv("TOURNAMENT_MAX_MATCHES", "1000"))
+
+    # speculative turns: generate the next turn right after committing one (per-session opt-in,
+    # this is the default), discarding it if the session is not advanced within the TTL
+    speculative_turns: bool = os.getenv("SPECULATIVE_TURNS", "0").lower() in ("1", "true", "yes")
+    speculative_ttl: float = float(os.getenv("SPECULATIVE_TTL", "120"))
+
+    # seconds each judge gets before it is dropped from the panel
+    judge_timeout: float = float(os.getenv("JUDGE_TIMEOUT", "120"))
+
+settings = Settings()
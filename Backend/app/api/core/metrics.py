@@ -0,0 +1,193 @@
+"""Minimal Prometheus-style metrics and per-request phase tracing.
+
+Metrics are process-local; with several workers each one exposes its own /metrics.
+``span(name)`` times a block into the ``debate_phase_seconds`` histogram and, when a
+``Trace`` is active in the current context, into that trace as well.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self): ...
+
+    @abstractmethod
+    def _render_child(self, key: Tuple[str, ...], child) -> List[str]: ...
+
+    # shortcuts for metrics without labels
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(child.value)}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def _render_child(self, key, child) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(child.bounds, child.counts):
+            cumulative += count
+            le = 'le="' + _number(bound) + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(child.sum)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {child.count}")
+        return lines
+
+REGISTRY: List[_Metric] = []
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+# --- metrics exported by the service
+HTTP_SECONDS = Histogram("debate_http_request_seconds", "HTTP request latency until response headers.", ("method", "route", "status"))
+PHASE_SECONDS = Histogram("debate_phase_seconds", "Time spent per processing phase of a request.", ("phase",))
+LLM_SECONDS = Histogram("debate_llm_request_seconds", "Provider call latency, excluding queueing.", ("provider", "model"))
+LLM_QUEUE_SECONDS = Histogram("debate_llm_queue_seconds", "Time spent waiting for a provider concurrency slot.", ("provider",))
+LLM_QUEUE_DEPTH = Gauge("debate_llm_queue_depth", "Calls waiting for a provider concurrency slot.", ("provider",))
+LLM_PROMPT_TOKENS = Counter("debate_llm_prompt_tokens_total", "Prompt tokens reported by providers.", ("model",))
+LLM_COMPLETION_TOKENS = Counter("debate_llm_completion_tokens_total", "Completion tokens reported by providers.", ("model",))
+LLM_CACHED_TOKENS = Counter("debate_llm_cached_prompt_tokens_total", "Prompt tokens providers served from their prompt cache.", ("model",))
+LLM_ERRORS = Counter("debate_llm_errors_total", "Failed provider attempts by exception type.", ("model", "error"))
+LLM_CACHE = Counter("debate_llm_cache_total", "LLM response cache lookups.", ("result",))
+SPECULATION = Counter("debate_speculative_turns_total", "Speculatively generated turns by outcome.", ("outcome",))
+ERRORS = Counter("debate_errors_total", "Requests that ended in an error, by exception type.", ("error",))
+ACTIVE_SESSIONS = Gauge("debate_active_sessions", "Sessions held by the session store.")
+RUNNER_QUEUE_DEPTH = Gauge("debate_runner_queue_depth", "Debates queued for server-side runs.")
+
+# --- tracing
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("debate_trace", default=None)
+
+class Trace:
+    """Collects phase durations for one request; activate with ``with Trace() as t:``."""
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+
+    def __enter__(self) -> "Trace":
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _current_trace.reset(self._token)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def timings_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items())
+
+def record(name: str, seconds: float) -> None:
+    PHASE_SECONDS.labels(name).observe(seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
@@ -0,0 +1,78 @@
+"""How much of a debate transcript is sent to the model on each call.
+
+Policies:
+  full          every prior statement (original behaviour)
+  last_k        only the most recent `context_last_k` statements
+  token_budget  the most recent statements that fit in `context_token_budget` tokens
+  summary       a rolling summary of older statements plus the last `context_last_k` verbatim
+"""
+from typing import Dict, List, Optional
+from app.api.core.config import settings
+from app.api.services.session_store import Turn
+
+POLICIES = ("full", "last_k", "token_budget", "summary")
+
+# per-message framing overhead in chat formats
+_MESSAGE_OVERHEAD = 4
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; close enough for budgeting
+    return len(text) // 4 + 1
+
+def estimate_prompt_tokens(messages: List[Dict]) -> int:
+    return sum(estimate_tokens(str(m.get("content", ""))) + _MESSAGE_OVERHEAD for m in messages)
+
+def _within_budget(statements: List[Turn], budget: int) -> List[Turn]:
+    used = 0
+    start = len(statements)
+    for s in reversed(statements):
+        used += estimate_tokens(s.text) + _MESSAGE_OVERHEAD
+        if used > budget:
+            break
+        start -= 1
+    return statements[start:]
+
+def select_context(statements: List[Turn], policy: str, summarized: int = 0) -> List[Turn]:
+    """Statements to send verbatim for a debater turn.
+
+    ``summarized`` is how many leading statements are already folded into the session summary.
+    """
+    if policy == "last_k":
+        return statements[-settings.context_last_k:] if settings.context_last_k else []
+    if policy == "token_budget":
+        return _within_budget(statements, settings.context_token_budget)
+    if policy == "summary":
+        return _within_budget(statements[summarized:], settings.context_token_budget)
+    return statements
+
+def select_judge_context(statements: List[Turn], policy: str, summarized: int = 0) -> List[Turn]:
+    """Statements to send verbatim to the judge, who needs more than the last few turns."""
+    if policy == "full":
+        return statements
+    if policy == "summary":
+        return statements[summarized:]
+    return _within_budget(statements, settings.context_token_budget)
+
+def pending_summary(statements: List[Turn], policy: str, summarized: int) -> Optional[List[Turn]]:
+    """Statements that should be folded into the summary now, or None.
+
+    Folding happens once a full round (two statements) has scrolled out of the last-K window,
+    so the summary is refreshed at most once per round.
+    """
+    if policy != "summary":
+        return None
+    cutoff = len(statements) - settings.context_last_k
+    if cutoff - summarized < 2:
+        return None
+    return statements[summarized:cutoff]
+
+def summary_messages(summary: Optional[str], statements: List[Turn]) -> List[Dict]:
+    lines = "\n".join(f"{s.speaker}: {s.text}" for s in statements)
+    return [
+        {"role": "system", "content": (
+            "You maintain a running summary of a debate. Merge the new statements into the summary, "
+            "keeping each side's key claims and rebuttals. Reply with the updated summary only, at most six sentences."
+        )},
+        {"role": "user", "content": f"Current summary: {summary or '(none yet)'}"},
+        {"role": "user", "content": f"New statements:\n{lines}"},
+    ]
@@ -1,8 +1,23 @@
-from typing import List, Dict, Tuple, Optional
+from typing import AsyncIterator, List, Dict, Sequence, Tuple, Optional, Union
 from uuid import uuid4, UUID
-from app.api.v1.schemas import Statement, DebateTurnResponse, JudgeResponse
-import copy
-from app.api.services.llm_client import get_llm_client
+from pydantic import ValidationError
+from app.api.v1.schemas import Statement, DebateTurnResponse, JudgeOutput, JudgeResponse, JudgeVerdict, RunStatusResponse
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from app.api.core import metrics
+from app.api.core.config import settings
+from app.api.services.context_policy import (
+    POLICIES, estimate_prompt_tokens, pending_summary, select_context, select_judge_context, summary_messages,
+)
+from app.api.services.llm_client import LLMClient, LLMResult, get_llm_client
+from app.api.services.session_store import DEFAULT_JUDGE_INSTRUCTIONS, SessionRecord, SessionStore, Turn, create_session_store
 
 # Allowed models (expand as needed)
 ALLOWED_MODELS = {
@@ -10,28 +25,159 @@ ALLOWED_MODELS = {
     "gemini-2.0-flash", "gemini-1.5", "text-bison-001"
 }
 
+@lru_cache(maxsize=4096)
+def _turn_prefix(speaker: str, stance: Optional[str], topic: str) -> Tuple[Dict, ...]:
+    """The leading messages of every prompt a debater gets in a session. Keyed by content,
+    so tournament matches on one topic share them too; treat the dicts as read-only."""
+    return (
+        {"role": "system", "content": (
+            f"You are {speaker}. You must argue the following stance: {stance}. "
+            "Do not concede; defend your stance or rebut your opponent. Each reply is one concise debate turn (one or two sentences)."
+        )},
+        {"role": "user", "content": f"Topic: {topic}"},
+    )
+
+# what judges score each debater on, out of 10
+JUDGE_CRITERIA = ("argument_strength", "rebuttal", "evidence", "persuasiveness")
+
+# speaker of the synthetic prompt appended for the next debater; never stored
+HINT_SPEAKER = "__system_hint__"
+
+# record fields exposed by get_session_state
+_STATE_FIELDS = (
+    "model_a", "model_b", "model_a_model", "model_b_model", "model_a_stance", "model_b_stance",
+    "judge_name", "judge_model", "judge_model_model", "judge_instructions", "context_policy", "speculate",
+    "current_turn", "current_round", "max_rounds", "done",
+)
+
+@dataclass(slots=True)
+class _Speculation:
+    # transcript length the turn was generated for; it is only valid at that point
+    cursor: int
+    task: asyncio.Task
+    expiry: asyncio.TimerHandle
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # a failed speculation is simply not used; don't log it as never retrieved
+    if not task.cancelled():
+        task.exception()
+
 class DebateManager:
-    def __init__(self):
-        self._sessions: Dict[UUID, Dict] = {}
-        self._llm = get_llm_client()
+    def __init__(self, store: Optional[SessionStore] = None, llm: Optional[LLMClient] = None):
+        self._store = store or create_session_store()
+        # a store that blocks (SQLite waiting on another worker's write lock) runs on its own
+        # thread, one call at a time and in submission order, so the event loop keeps serving
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-store") if self._store.blocking else None
+        self._llm = llm or get_llm_client()
+        # background next-turn generations by session, for sessions created with speculate=True
+        self._speculative: Dict[UUID, _Speculation] = {}
 
-    async def _call_model(self, model_name: str, role_hint: str, topic: str, recent_statements: List[Statement]) -> str:
-        messages = [
-            {"role": "system", "content": role_hint},
-            {"role": "user", "content": f"Topic: {topic}"},
-        ]
+    async def _call_store(self, method: str, *args, **kwargs):
+        call = functools.partial(getattr(self._store, method), *args, **kwargs)
+        if self._io is None:
+            return call()
+        return await asyncio.get_running_loop().run_in_executor(self._io, call)
+
+    @staticmethod
+    def _prefix(session: SessionRecord, speaker: str) -> Tuple[Dict, ...]:
+        return _turn_prefix(speaker, session.stance_for(speaker), session.topic)
+
+    def _build_messages(self, prefix: Tuple[Dict, ...], instruction: str, recent_statements: Sequence[Turn], summary: Optional[str] = None) -> List[Dict]:
+        # stable prefix first, then what grows append-only (summary, transcript), then the
+        # per-turn instruction, so consecutive turns share as long a prompt prefix as possible
+        messages = list(prefix)
+        if summary:
+            messages.append({"role": "user", "content": f"Summary of the earlier debate: {summary}"})
         if recent_statements:
             # include the transcript lines
             for s in recent_statements:
-                messages.append({"role": "user", "content": f"{s.speaker}: {s.text}"})
-        messages.append({"role": "user", "content": "Produce one concise debate turn (one or two sentences)."})
-        return await self._llm.generate(model=model_name, messages=messages, temperature=0.7, max_tokens=512)
+                messages.append({"role": "user", "content": s.line()})
+        messages.append({"role": "user", "content": instruction})
+        return messages
+
+    async def _call_model(self, model_name: str, prefix: Tuple[Dict, ...], instruction: str, recent_statements: Sequence[Turn], summary: Optional[str] = None) -> LLMResult:
+        with metrics.span("prompt_build"):
+            messages = self._build_messages(prefix, instruction, recent_statements, summary)
+        result = await self._llm.generate_with_usage(model=model_name, messages=messages, temperature=0.7, max_tokens=512, prefix=len(prefix))
+        if result.prompt_tokens is None:
+            result.prompt_tokens = estimate_prompt_tokens(messages)
+        return result
+
+    async def _refresh_summary(self, session_id: UUID, session: SessionRecord) -> None:
+        # fold statements that scrolled out of the last-K window into the rolling summary
+        summarized = session.summary_upto
+        folded = pending_summary(session.transcript, session.context_policy, summarized)
+        if not folded:
+            return
+        summary = await self._llm.generate(
+            model=settings.context_summary_model,
+            messages=summary_messages(session.summary, folded),
+            temperature=0.0,
+            max_tokens=settings.context_summary_max_tokens,
+        )
+        await self._call_store("update", session_id, summary=summary, summary_upto=summarized + len(folded))
+        session.summary, session.summary_upto = summary, summarized + len(folded)
+
+    async def handle_turn(
+        self,
+        model_a: str,
+        model_b: str,
+        current_turn: str,
+        topic: str,
+        previous_conversation: List[Statement],
+        current_round: int,
+        max_rounds: int,
+        model_a_model: str = "gpt-3.5-turbo",
+        model_b_model: str = "gpt-3.5-turbo",
+        model_a_stance: Optional[str] = "Argue in favor",
+        model_b_stance: Optional[str] = "Argue against",
+        context_policy: Optional[str] = None,
+    ) -> DebateTurnResponse:
+        """Stateless turn: everything comes from the request and nothing is stored.
 
-    # --- existing handle_turn / create_session / advance_session / get_session_state methods ---
-    # (keep your current implementations, but ensure create_session stores judge fields)
-    # Below are the create_session, advance_session, get_session_state and new evaluate_session implementations.
+        Only the newly generated statement is returned; the caller appends it to its own
+        copy of the conversation. The summary context policy needs stored state, so here it
+        falls back to its token budget.
+        """
+        if current_turn not in (model_a, model_b):
+            raise ValueError("current_turn must be model_a or model_b")
+        if model_a_model not in ALLOWED_MODELS or model_b_model not in ALLOWED_MODELS:
+            raise ValueError(f"model must be one of: {sorted(ALLOWED_MODELS)}")
+        if current_round > max_rounds:
+            raise ValueError("debate already finished: current_round is past max_rounds")
+        context_policy = context_policy or settings.context_policy
+        if context_policy not in POLICIES:
+            raise ValueError(f"context_policy must be one of: {list(POLICIES)}")
 
-    def create_session(
+        # a throwaway record over the request; clients may echo hints back, which are dropped here
+        turn = self._prepare_turn(SessionRecord(
+            model_a=model_a,
+            model_b=model_b,
+            model_a_model=model_a_model,
+            model_b_model=model_b_model,
+            model_a_stance=model_a_stance,
+            model_b_stance=model_b_stance,
+            topic=topic,
+            current_turn=current_turn,
+            current_round=current_round,
+            max_rounds=max_rounds,
+            context_policy=context_policy,
+            transcript=[Turn.from_statement(st) for st in previous_conversation if st.speaker != HINT_SPEAKER],
+        ))
+        result = await self._call_model(model_name=turn["model_name"], prefix=turn["prefix"], instruction=turn["instruction"], recent_statements=turn["context"])
+        new_stmt = Turn(speaker=current_turn, round=current_round, text=result.text).render()
+        next_turn, next_round, done = self._next_state(model_a, model_b, current_turn, current_round, max_rounds)
+        return DebateTurnResponse(
+            next_turn=next_turn,
+            current_round=next_round,
+            done=done,
+            updated_conversation=[new_stmt],
+            prompt_tokens=result.prompt_tokens,
+            cached_tokens=result.cached_tokens,
+            message=f"Processed turn for {current_turn}"
+        )
+
+    async def create_session(
         self,
         model_a: str,
         model_b: str,
@@ -45,33 +191,40 @@ class DebateManager:
         judge_name: Optional[str] = "Judge",
         judge_model: Optional[str] = "JudgeAI",
         judge_model_model: Optional[str] = "gpt-4",
-        judge_instructions: Optional[str] = "Read the full debate transcript and decide the winner based on strength of arguments and persuasiveness."
+        judge_instructions: Optional[str] = DEFAULT_JUDGE_INSTRUCTIONS,
+        context_policy: Optional[str] = None,
+        speculate: Optional[bool] = None,
     ) -> Tuple[UUID, DebateTurnResponse]:
         if starting_turn not in (model_a, model_b):
             raise ValueError("starting_turn must be model_a or model_b")
         if model_a_model not in ALLOWED_MODELS or model_b_model not in ALLOWED_MODELS or judge_model_model not in ALLOWED_MODELS:
             raise ValueError(f"model must be one of: {sorted(ALLOWED_MODELS)}")
+        context_policy = context_policy or settings.context_policy
+        if context_policy not in POLICIES:
+            raise ValueError(f"context_policy must be one of: {list(POLICIES)}")
 
         session_id = uuid4()
-        session = {
-            "model_a": model_a,
-            "model_b": model_b,
-            "model_a_model": model_a_model,
-            "model_b_model": model_b_model,
-            "model_a_stance": model_a_stance,
-            "model_b_stance": model_b_stance,
-            "judge_name": judge_name,
-            "judge_model": judge_model,
-            "judge_model_model": judge_model_model,
-            "judge_instructions": judge_instructions,
-            "topic": topic,
-            "current_turn": starting_turn,
-            "current_round": 1,
-            "max_rounds": max_rounds,
-            "transcript": [],
-            "done": False,
-        }
-        self._sessions[session_id] = session
+        record = SessionRecord(
+            model_a=model_a,
+            model_b=model_b,
+            model_a_model=model_a_model,
+            model_b_model=model_b_model,
+            model_a_stance=model_a_stance,
+            model_b_stance=model_b_stance,
+            judge_name=judge_name,
+            judge_model=judge_model,
+            judge_model_model=judge_model_model,
+            judge_instructions=judge_instructions,
+            topic=topic,
+            current_turn=starting_turn,
+            max_rounds=max_rounds,
+            context_policy=context_policy,
+            speculate=settings.speculative_turns if speculate is None else speculate,
+        )
+        # build both sides' prompt prefixes now; every later turn reuses them
+        self._prefix(record, model_a)
+        self._prefix(record, model_b)
+        await self._call_store("create", session_id, record)
         initial_state = DebateTurnResponse(
             next_turn=starting_turn,
             current_round=1,
@@ -81,135 +234,338 @@ class DebateManager:
         )
         return session_id, initial_state
 
-    # (reuse your existing advance_session implementation but ensure it persists judge fields - unchanged here)
-    async def advance_session(self, session_id: UUID) -> DebateTurnResponse:
-        session = self._sessions[session_id]
-        if session["done"]:
-            return DebateTurnResponse(
-                next_turn=session["current_turn"],
-                current_round=session["current_round"],
-                done=True,
-                updated_conversation=session["transcript"],
-                message="session already done"
-            )
+    @staticmethod
+    def _hint(session: SessionRecord, last: Turn) -> Statement:
+        # prompt for the next speaker; derived from the last turn when rendering, never stored
+        return Statement(
+            speaker=HINT_SPEAKER,
+            text=(
+                f"[You are {session.current_turn}] You must argue the following stance: {session.stance_for(session.current_turn)}. "
+                f"Respond to: \"{last.line()}\". Be concise and persuasive."
+            ),
+            round=session.current_round,
+        )
 
-        # existing logic: pick current_turn, model_name from session and call _call_model...
-        model_a = session["model_a"]
-        model_b = session["model_b"]
-        current_turn = session["current_turn"]
-        topic = session["topic"]
-        current_round = session["current_round"]
-        max_rounds = session["max_rounds"]
-        transcript = [s for s in session["transcript"] if s.speaker != "__system_hint__"]
-
-        if current_turn == model_a:
-            model_name = session.get("model_a_model", "gpt-3.5-turbo")
-            stance = session.get("model_a_stance", "Argue in favor")
-        else:
-            model_name = session.get("model_b_model", "gpt-3.5-turbo")
-            stance = session.get("model_b_stance", "Argue against")
-
-        opponent = model_a if current_turn == model_b else model_b
-        opponent_latest = ""
-        for s in reversed(transcript):
-            if s.speaker != "__system_hint__":
-                opponent_latest = s.text
-                break
-
-        if opponent_latest:
-            role_hint = (
-                f"You are {current_turn}. You must argue the following stance: {stance}. "
-                f"Respond to {opponent}'s latest: \"{opponent_latest}\". Do not concede; defend or rebut while staying on stance."
+    @classmethod
+    def _view(cls, session: SessionRecord, cursor: Optional[int] = None, since_round: Optional[int] = None, include_hints: bool = True) -> List[Statement]:
+        # the slice of the conversation a client asked for: statements after `cursor`
+        # and/or from `since_round` on, plus the pending hint for the next speaker
+        transcript = session.transcript
+        items = islice(transcript, cursor, None) if cursor else transcript
+        view = [t.render() for t in items if since_round is None or t.round >= since_round]
+        if include_hints and transcript:
+            view.append(cls._hint(session, transcript[-1]))
+        return view
+
+    def _done_response(self, session: SessionRecord, **view) -> DebateTurnResponse:
+        return DebateTurnResponse(
+            next_turn=session.current_turn,
+            current_round=session.current_round,
+            done=True,
+            updated_conversation=self._view(session, **view),
+            cursor=len(session.transcript),
+            message="session already done"
+        )
+
+    def _prepare_turn(self, session: SessionRecord) -> Dict:
+        current_turn = session.current_turn
+        opponent = session.model_a if current_turn == session.model_b else session.model_b
+        transcript = session.transcript
+
+        if transcript:
+            instruction = (
+                f"Respond to {opponent}'s latest: \"{transcript[-1].line()}\". "
+                "Defend or rebut in one or two concise sentences."
             )
         else:
-            role_hint = (
-                f"You are {current_turn}. You must argue the following stance: {stance}. "
-                f"Open the debate on '{topic}' with one concise, persuasive point that supports your stance."
-            )
+            instruction = f"Open the debate on '{session.topic}' with one concise, persuasive point that supports your stance."
 
-        generated = await self._call_model(model_name=model_name, role_hint=role_hint, topic=topic, recent_statements=transcript)
-        new_text = f"(round {current_round}){current_turn}: {generated}"
-        new_stmt = Statement(speaker=current_turn, text=new_text, round=current_round)
-        transcript.append(new_stmt)
+        return {
+            "model_name": session.model_for(current_turn),
+            "prefix": self._prefix(session, current_turn),
+            "instruction": instruction,
+            "context": select_context(transcript, session.context_policy, session.summary_upto),
+            "summary": session.summary,
+        }
 
+    @staticmethod
+    def _next_state(model_a: str, model_b: str, current_turn: str, current_round: int, max_rounds: int) -> Tuple[str, int, bool]:
+        # model_b closes each round; the debate ends when it closes the last one
         other = model_a if current_turn == model_b else model_b
-        next_turn = other
         next_round = current_round + 1 if current_turn == model_b else current_round
         done = (current_turn == model_b and current_round >= max_rounds)
+        return other, next_round, done
 
-        hint_text = (
-            f"[You are {next_turn}] You must argue the following stance: {session.get('model_a_stance') if next_turn==model_a else session.get('model_b_stance')}. "
-            f"Respond to: \"{new_text}\". Be concise and persuasive."
-        )
-        hint_stmt = Statement(speaker="__system_hint__", text=hint_text, round=next_round)
-        transcript.append(hint_stmt)
+    async def _commit_turn(self, session_id: UUID, session: SessionRecord, expected: int, generated: str, prompt_tokens: Optional[int] = None, cached_tokens: Optional[int] = None, **view) -> DebateTurnResponse:
+        current_turn = session.current_turn
+        turn = Turn(speaker=current_turn, round=session.current_round, text=generated)
+        next_turn, next_round, done = self._next_state(session.model_a, session.model_b, current_turn, session.current_round, session.max_rounds)
 
-        session["transcript"] = transcript
-        session["current_turn"] = next_turn
-        session["current_round"] = next_round
-        if done:
-            session["done"] = True
+        # one write, refused if another request or worker committed a turn since `expected` was read
+        await self._call_store("commit_turn", session_id, turn, expected, current_turn=next_turn, current_round=next_round, done=done)
+        # stores that hand out copies leave `session` stale; mirror the writes for the response
+        if not session.transcript or session.transcript[-1] is not turn:
+            session.transcript.append(turn)
+        session.current_turn, session.current_round, session.done = next_turn, next_round, done
 
         return DebateTurnResponse(
             next_turn=next_turn,
             current_round=next_round,
             done=done,
-            updated_conversation=transcript,
+            updated_conversation=self._view(session, **view),
+            cursor=len(session.transcript),
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
             message=f"Processed turn for {current_turn}"
         )
 
-    def get_session_state(self, session_id: UUID):
-        session = self._sessions[session_id]
+    async def advance_session(self, session_id: UUID, **view) -> DebateTurnResponse:
+        """Generate the next turn.
+
+        By default the response carries the whole conversation; pass ``cursor`` (the
+        ``cursor`` of a previous response), ``since_round`` and/or ``include_hints=False``
+        to receive only the part the client has not seen yet.
+        """
+        with metrics.span("load"):
+            session = await self._call_store("get", session_id)
+        if session.done:
+            return self._done_response(session, **view)
+
+        expected = len(session.transcript)
+        result = await self._speculated(session_id, expected)
+        if result is None:
+            result = await self._generate(session_id, session)
+        with metrics.span("commit"):
+            resp = await self._commit_turn(session_id, session, expected, result.text, prompt_tokens=result.prompt_tokens, cached_tokens=result.cached_tokens, **view)
+        self._speculate(session_id, session)
+        return resp
+
+    async def _generate(self, session_id: UUID, session: SessionRecord) -> LLMResult:
+        with metrics.span("summary"):
+            await self._refresh_summary(session_id, session)
+        with metrics.span("prompt_build"):
+            turn = self._prepare_turn(session)
+        return await self._call_model(model_name=turn["model_name"], prefix=turn["prefix"], instruction=turn["instruction"], recent_statements=turn["context"], summary=turn["summary"])
+
+    def _speculate(self, session_id: UUID, session: SessionRecord) -> None:
+        """Start generating the next turn in the background if the session opted in.
+
+        The result is used only if the next advance finds the transcript where it was left.
+        Judging or deleting the session, or not advancing it within SPECULATIVE_TTL, cancels
+        it. Speculation is per process: an advance served by another worker generates anew.
+        """
+        self._cancel_speculation(session_id, "stale")
+        if not session.speculate or session.done:
+            return
+        loop = asyncio.get_running_loop()
+        # a fresh context keeps the background work out of the current request's trace
+        task = loop.create_task(self._generate(session_id, session), context=contextvars.Context())
+        task.add_done_callback(_retrieve_exception)
+        expiry = loop.call_later(settings.speculative_ttl, self._cancel_speculation, session_id, "expired", task)
+        self._speculative[session_id] = _Speculation(cursor=len(session.transcript), task=task, expiry=expiry)
+
+    async def _speculated(self, session_id: UUID, cursor: int) -> Optional[LLMResult]:
+        """The turn pre-generated for this point of the debate, waiting for it if still running;
+        None if there is none or it failed."""
+        spec = self._speculative.pop(session_id, None)
+        if spec is None:
+            return None
+        spec.expiry.cancel()
+        if spec.cursor != cursor:
+            spec.task.cancel()
+            metrics.SPECULATION.labels("stale").inc()
+            return None
+        try:
+            with metrics.span("speculative_wait"):
+                await asyncio.wait({spec.task})
+        except asyncio.CancelledError:
+            spec.task.cancel()
+            raise
+        if spec.task.cancelled() or spec.task.exception() is not None:
+            metrics.SPECULATION.labels("failed").inc()
+            return None
+        metrics.SPECULATION.labels("served").inc()
+        return spec.task.result()
+
+    def _cancel_speculation(self, session_id: UUID, outcome: str, task: Optional[asyncio.Task] = None) -> None:
+        spec = self._speculative.get(session_id)
+        # `task` guards expiry timers against cancelling a newer speculation
+        if spec is None or (task is not None and spec.task is not task):
+            return
+        del self._speculative[session_id]
+        spec.expiry.cancel()
+        spec.task.cancel()
+        metrics.SPECULATION.labels(outcome).inc()
+
+    async def stream_advance_session(self, session_id: UUID, **view) -> AsyncIterator[Union[str, DebateTurnResponse]]:
+        """Like advance_session, but yields text deltas as they arrive and the committed turn last.
+
+        The session lookup happens eagerly so a missing session raises KeyError here,
+        before the caller starts streaming.
+        """
+        session = await self._call_store("get", session_id)
+        expected = len(session.transcript)
+
+        async def _stream():
+            if session.done:
+                yield self._done_response(session, **view)
+                return
+            result = await self._speculated(session_id, expected)
+            if result is not None:
+                # already generated: one delta with the whole turn
+                yield result.text
+                resp = await self._commit_turn(session_id, session, expected, result.text, prompt_tokens=result.prompt_tokens, cached_tokens=result.cached_tokens, **view)
+            else:
+                await self._refresh_summary(session_id, session)
+                turn = self._prepare_turn(session)
+                messages = self._build_messages(turn["prefix"], turn["instruction"], turn["context"], turn["summary"])
+                chunks = []
+                usage: Dict = {}
+                async for delta in self._llm.stream(model=turn["model_name"], messages=messages, temperature=0.7, max_tokens=512, usage=usage, prefix=len(turn["prefix"])):
+                    chunks.append(delta)
+                    yield delta
+                prompt_tokens = usage.get("prompt_tokens") or estimate_prompt_tokens(messages)
+                resp = await self._commit_turn(session_id, session, expected, "".join(chunks).strip(), prompt_tokens=prompt_tokens, cached_tokens=usage.get("cached_tokens"), **view)
+            self._speculate(session_id, session)
+            yield resp
+
+        return _stream()
+
+    async def get_session_state(self, session_id: UUID, cursor: int = 0, since_round: Optional[int] = None, limit: Optional[int] = None, include_hints: bool = True):
+        session, page, next_cursor, total = await self._call_store("get_page", session_id, cursor=cursor, since_round=since_round, limit=limit)
+        transcript = [t.render() for t in page]
+        # the hint trails the transcript, so it only belongs on the last page
+        if include_hints and total and next_cursor >= total:
+            last = page[-1] if page else (await self._call_store("get_page", session_id, cursor=total - 1))[1][-1]
+            transcript.append(self._hint(session, last))
         return {
             "session_id": session_id,
-            "model_a": session["model_a"],
-            "model_b": session["model_b"],
-            "model_a_model": session["model_a_model"],
-            "model_b_model": session["model_b_model"],
-            "model_a_stance": session.get("model_a_stance"),
-            "model_b_stance": session.get("model_b_stance"),
-            "judge_name": session.get("judge_name"),
-            "judge_model": session.get("judge_model"),
-            "judge_model_model": session.get("judge_model_model"),
-            "judge_instructions": session.get("judge_instructions"),
-            "current_turn": session["current_turn"],
-            "current_round": session["current_round"],
-            "max_rounds": session["max_rounds"],
-            "done": session["done"],
-            "transcript": session["transcript"],
+            **{name: getattr(session, name) for name in _STATE_FIELDS},
+            "transcript": transcript,
+            "cursor": next_cursor,
         }
 
+    async def session_count(self) -> int:
+        return await self._call_store("count")
+
+    async def save_run(self, session_id: UUID, status: RunStatusResponse, owner: Optional[str] = None, lease: Optional[float] = None) -> None:
+        """Save a run status; ``owner`` names the worker driving the run, which must save it
+        again within ``lease`` seconds for an unfinished run to stay alive."""
+        run = status.model_dump(mode="json")
+        run["owner"] = owner
+        run["lease_until"] = time.time() + lease if lease is not None else None
+        await self._call_store("update", session_id, run=run)
+
+    async def get_run(self, session_id: UUID) -> Optional[RunStatusResponse]:
+        """The last run status any worker saved for the session, or None if it was never run.
+
+        An unfinished run whose lease ran out (its worker died) is reported as failed.
+        """
+        run = (await self._call_store("get_page", session_id, limit=0))[0].run
+        if run is None:
+            return None
+        run = dict(run)
+        owner, lease_until = run.pop("owner", None), run.pop("lease_until", None)
+        status = RunStatusResponse(**run)
+        if status.status in ("queued", "running") and lease_until is not None and lease_until < time.time():
+            status = status.model_copy(update={"status": "failed", "error": f"worker {owner} stopped reporting"})
+        return status
+
+    def close(self) -> None:
+        for session_id in list(self._speculative):
+            self._cancel_speculation(session_id, "cancelled")
+        if self._io is not None:
+            # let queued writes finish before the store goes away
+            self._io.shutdown(wait=True)
+        self._store.close()
+
+    async def delete_session(self, session_id: UUID) -> None:
+        await self._call_store("get", session_id)
+        self._cancel_speculation(session_id, "cancelled")
+        await self._call_store("delete", session_id)
+
     # --- New: evaluate_session (judge)
-    async def evaluate_session(self, session_id: UUID) -> JudgeResponse:
-        session = self._sessions[session_id]
-        transcript = [s for s in session["transcript"] if s.speaker != "__system_hint__"]
-        topic = session["topic"]
-        model_a = session["model_a"]
-        model_b = session["model_b"]
+    def _judge_messages(self, session: SessionRecord) -> List[Dict]:
+        policy = session.context_policy
+        transcript = select_judge_context(session.transcript, policy, session.summary_upto)
+        topic = session.topic
+        model_a = session.model_a
+        model_b = session.model_b
 
-        judge_model_name = session.get("judge_model_model", "gpt-4")
-        judge_instructions = session.get("judge_instructions", "Read the full debate transcript and decide the winner based on strength of arguments and persuasiveness.")
+        judge_instructions = session.judge_instructions or DEFAULT_JUDGE_INSTRUCTIONS
 
         # Build role hint with explicit tasks for judge
         role_hint = (
             f"You are the judge. {judge_instructions} "
-            f"Return output with a single-line 'Winner: <{model_a}|{model_b}|Tie>' then 'Reasoning:' followed by a short justification."
+            f"Score both debaters from 0 to 10 on each of: {', '.join(JUDGE_CRITERIA)}. "
+            f'Reply with a JSON object only: {{"winner": "{model_a}" | "{model_b}" | "Tie", '
+            f'"criteria": {{"<criterion>": {{"{model_a}": <score>, "{model_b}": <score>}}}}, "reasoning": "<short justification>"}}.'
         )
 
         # Build messages: include stances and the transcript
         messages = [
             {"role": "system", "content": role_hint},
             {"role": "user", "content": f"Topic: {topic}"},
-            {"role": "user", "content": f"{model_a} stance: {session.get('model_a_stance')}"},
-            {"role": "user", "content": f"{model_b} stance: {session.get('model_b_stance')}"},
-            {"role": "user", "content": "Transcript:"}
+            {"role": "user", "content": f"{model_a} stance: {session.model_a_stance}"},
+            {"role": "user", "content": f"{model_b} stance: {session.model_b_stance}"},
         ]
+        if policy == "summary" and session.summary:
+            messages.append({"role": "user", "content": f"Summary of the earlier debate: {session.summary}"})
+        messages.append({"role": "user", "content": "Transcript:"})
         for s in transcript:
-            messages.append({"role": "user", "content": f"{s.speaker}: {s.text}"})
+            messages.append({"role": "user", "content": s.line()})
 
         messages.append({"role": "user", "content": "Decide the winner."})
+        return messages
+
+    @staticmethod
+    def _verdict_schema(model_a: str, model_b: str) -> Dict:
+        # JSON Schema for JudgeOutput, written out in the strict form structured outputs require
+        scores = {
+            "type": "object",
+            "properties": {model_a: {"type": "number"}, model_b: {"type": "number"}},
+            "required": [model_a, model_b],
+            "additionalProperties": False,
+        }
+        return {
+            "title": "judge_verdict",
+            "type": "object",
+            "properties": {
+                "winner": {"type": "string", "enum": [model_a, model_b, "Tie"]},
+                "criteria": {
+                    "type": "object",
+                    "properties": {c: scores for c in JUDGE_CRITERIA},
+                    "required": list(JUDGE_CRITERIA),
+                    "additionalProperties": False,
+                },
+                "reasoning": {"type": "string"},
+            },
+            "required": ["winner", "criteria", "reasoning"],
+            "additionalProperties": False,
+        }
 
-        generated = await self._llm.generate(model=judge_model_name, messages=messages, temperature=0.0, max_tokens=512)
+    @staticmethod
+    def _parse_output(generated: str, candidates: Sequence[str]) -> JudgeOutput:
+        """Validate a JSON verdict; raises ValueError with a message fit to send back to the model."""
+        text = generated.strip()
+        # tolerate a markdown fence or chatter around the object
+        first, last = text.find("{"), text.rfind("}")
+        if first == -1 or last < first:
+            raise ValueError("no JSON object found")
+        try:
+            output = JudgeOutput.model_validate_json(text[first:last + 1])
+        except ValidationError as e:
+            raise ValueError(str(e)) from None
+        canonical = {c.lower(): c for c in candidates}
+        winner = canonical.get(output.winner.strip().lower())
+        if winner is None:
+            raise ValueError(f"winner must be one of {list(candidates)}, got {output.winner!r}")
+        output.winner = winner
+        output.criteria = {c: {canonical.get(k.lower(), k): v for k, v in by.items()} for c, by in output.criteria.items()}
+        return output
+
+    @staticmethod
+    def _parse_verdict(generated: str) -> Tuple[Optional[str], str]:
         # naive parse: look for 'Winner:' then remainder as reasoning
         winner = None
         reasoning = generated
@@ -229,10 +585,129 @@ class DebateManager:
             except Exception:
                 winner = None
                 reasoning = generated
+        return winner, reasoning
+
+    def _read_verdict(self, generated: str, candidates: Sequence[str]) -> JudgeOutput:
+        # JSON first; a well-formed "Winner: X" reply from a model that ignored the format
+        # is still usable and cheaper than asking again
+        try:
+            return self._parse_output(generated, candidates)
+        except ValueError:
+            winner, reasoning = self._parse_verdict(generated)
+            canonical = {c.lower(): c for c in candidates}
+            if winner is not None and winner.lower() in canonical:
+                return JudgeOutput(winner=canonical[winner.lower()], reasoning=reasoning)
+            raise
+
+    async def _ask_judge(self, judge_model_name: str, messages: List[Dict], session: SessionRecord) -> JudgeVerdict:
+        started = time.monotonic()
+        candidates = (session.model_a, session.model_b, "Tie")
+        schema = self._verdict_schema(session.model_a, session.model_b)
+        # the system prompt, topic and both stances open every judge call of a session
+        result = await self._llm.generate_with_usage(model=judge_model_name, messages=messages, temperature=0.0, max_tokens=512, schema=schema, prefix=4)
+        prompt_tokens = result.prompt_tokens if result.prompt_tokens is not None else estimate_prompt_tokens(messages)
+        try:
+            output = self._read_verdict(result.text, candidates)
+        except ValueError as e:
+            # an unusable verdict must not be served from the response cache next time
+            self._llm.uncache(judge_model_name, messages, temperature=0.0, max_tokens=512, schema=schema)
+            # one repair round: show the judge its reply and what was wrong with it
+            repair = messages + [
+                {"role": "assistant", "content": result.text},
+                {"role": "user", "content": f"That reply was not a valid verdict ({e}). Reply again with the JSON object only."},
+            ]
+            result = await self._llm.generate_with_usage(model=judge_model_name, messages=repair, temperature=0.0, max_tokens=512, schema=schema, prefix=4)
+            prompt_tokens += result.prompt_tokens if result.prompt_tokens is not None else estimate_prompt_tokens(repair)
+            try:
+                output = self._read_verdict(result.text, candidates)
+            except ValueError:
+                self._llm.uncache(judge_model_name, repair, temperature=0.0, max_tokens=512, schema=schema)
+                output = None
+        return JudgeVerdict(
+            judge_model=judge_model_name,
+            winner=output.winner if output else None,
+            reasoning=output.reasoning if output else result.text,
+            criteria=(output.criteria or None) if output else None,
+            latency_ms=round((time.monotonic() - started) * 1000, 1),
+            prompt_tokens=prompt_tokens,
+        )
 
-        return JudgeResponse(winner=winner, reasoning=reasoning, scores=None)
+    @staticmethod
+    def _mean_criteria(verdicts: List[JudgeVerdict]) -> Optional[Dict[str, Dict[str, float]]]:
+        totals: Dict[str, Dict[str, List[float]]] = {}
+        for v in verdicts:
+            for criterion, by in (v.criteria or {}).items():
+                for debater, score in by.items():
+                    totals.setdefault(criterion, {}).setdefault(debater, []).append(score)
+        if not totals:
+            return None
+        return {c: {d: round(sum(xs) / len(xs), 2) for d, xs in by.items()} for c, by in totals.items()}
 
-# dependency factory
-_singleton = DebateManager()
+    async def evaluate_session(self, session_id: UUID, judge_models: Optional[List[str]] = None, timeout: Optional[float] = None) -> JudgeResponse:
+        """Judge the debate with the session's judge, or concurrently with a panel of judge models.
+
+        Each judge gets ``timeout`` seconds; failed or timed-out judges are reported in ``panel``
+        and left out of the vote. ``scores`` holds each candidate's share of the valid votes.
+        """
+        session = await self._call_store("get", session_id)
+        # the verdict is final; a turn generated ahead would never be used
+        self._cancel_speculation(session_id, "cancelled")
+        judge_models = judge_models or [session.judge_model_model or "gpt-4"]
+        if any(m not in ALLOWED_MODELS for m in judge_models):
+            raise ValueError(f"model must be one of: {sorted(ALLOWED_MODELS)}")
+        timeout = timeout or settings.judge_timeout
+        messages = self._judge_messages(session)
+
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(self._ask_judge(m, messages, session), timeout=timeout) for m in judge_models),
+            return_exceptions=True,
+        )
+        panel = []
+        for judge_model_name, outcome in zip(judge_models, outcomes):
+            if isinstance(outcome, BaseException):
+                if len(judge_models) == 1:
+                    raise outcome
+                error = "timed out" if isinstance(outcome, asyncio.TimeoutError) else str(outcome) or type(outcome).__name__
+                outcome = JudgeVerdict(judge_model=judge_model_name, error=error)
+            panel.append(outcome)
+
+        answered = [v for v in panel if v.error is None]
+        if not answered:
+            raise RuntimeError("all judges failed: " + "; ".join(f"{v.judge_model}: {v.error}" for v in panel))
+        prompt_tokens = sum(v.prompt_tokens or 0 for v in answered)
+        if len(panel) == 1:
+            verdict = panel[0]
+            scores = {verdict.winner: 1.0} if verdict.winner else None
+            return JudgeResponse(winner=verdict.winner, reasoning=verdict.reasoning, scores=scores, criteria=verdict.criteria, prompt_tokens=prompt_tokens, panel=panel)
+
+        # canonicalise votes so 'modela' and 'ModelA' count together
+        candidates = {c.lower(): c for c in (session.model_a, session.model_b, "Tie")}
+        votes = Counter(candidates.get(v.winner.lower(), v.winner) for v in answered if v.winner)
+        total = sum(votes.values())
+        ranked = votes.most_common()
+        if not ranked:
+            winner = None
+        elif len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+            winner = "Tie"
+        else:
+            winner = ranked[0][0]
+        reasoning = "\n".join(
+            [f"{votes.get(winner, 0)} of {len(panel)} judges voted {winner}." if winner else "No judge gave a usable verdict."]
+            + [f"[{v.judge_model}] {v.reasoning}" for v in answered]
+        )
+        scores = {c: n / total for c, n in ranked} if total else None
+        return JudgeResponse(winner=winner, reasoning=reasoning, scores=scores, criteria=self._mean_criteria(answered), prompt_tokens=prompt_tokens, panel=panel)
+
+# dependency factory; built on first use (or at startup) in each worker process
+_singleton: DebateManager | None = None
 def get_debate_manager() -> DebateManager:
-    return _singleton
\ No newline at end of file
+    global _singleton
+    if _singleton is None:
+        _singleton = DebateManager()
+    return _singleton
+
+def close_debate_manager() -> None:
+    global _singleton
+    if _singleton is not None:
+        _singleton.close()
+        _singleton = None
\ No newline at end of file
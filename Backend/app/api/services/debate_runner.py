@@ -0,0 +1,193 @@
+import asyncio
+import os
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID, uuid4
+from app.api.core.config import settings
+from app.api.v1.schemas import RunStatusResponse
+from app.api.services.debate_manager import DebateManager, get_debate_manager
+
+TERMINAL = {"completed", "failed"}
+# how often a worker following a run owned by another worker re-reads its status
+REMOTE_POLL_INTERVAL = 0.5
+
+class DebateRunner:
+    """Drives whole debates (every turn, then the judge) on a bounded pool of asyncio workers.
+
+    Sessions are queued with `submit`; callers poll `status` or follow `subscribe`.
+    Every status change is also saved on the session, so with several worker processes
+    sharing a store any of them can report on a run another one is driving. Only runs
+    still in progress are held here; finished ones are read back from the session. Unfinished
+    statuses are re-saved as a heartbeat, so a run whose worker died is seen as failed and
+    can be submitted again.
+    """
+
+    def __init__(self, manager: DebateManager, workers: int = settings.runner_workers, queue_size: int = settings.runner_queue_size, lease: float = settings.runner_lease):
+        self._manager = manager
+        self._owner = f"{os.getpid()}-{uuid4().hex[:8]}"
+        self._lease = lease
+        self._workers = workers
+        self._queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: Dict[UUID, RunStatusResponse] = {}
+        self._subscribers: Dict[UUID, List[asyncio.Queue]] = {}
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+            self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        # anything still queued will never run
+        for session_id, job in list(self._jobs.items()):
+            if job.status not in TERMINAL:
+                await self._publish(session_id, status="failed", error="runner stopped")
+
+    async def submit(self, session_id: UUID) -> RunStatusResponse:
+        job = self._jobs.get(session_id) or await self._manager.get_run(session_id)
+        if job is not None and job.status not in TERMINAL:
+            return job
+        state = await self._manager.get_session_state(session_id, limit=0, include_hints=False)
+        if session_id in self._jobs:
+            # submitted again while we were reading the session
+            return self._jobs[session_id]
+        self._ensure_started()
+        job = RunStatusResponse(session_id=session_id, status="queued", current_round=state["current_round"], done=state["done"])
+        try:
+            self._queue.put_nowait(session_id)
+        except asyncio.QueueFull:
+            raise RuntimeError("run queue is full, retry later")
+        self._jobs[session_id] = job
+        await self._save(session_id, job)
+        return job
+
+    async def forget(self, session_id: UUID) -> None:
+        """Drop a deleted session's run; a worker still driving it stops at its next turn."""
+        job = self._jobs.get(session_id)
+        if job is not None:
+            await self._publish(session_id, status="failed", error="session deleted")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def status(self, session_id: UUID) -> RunStatusResponse:
+        job = self._jobs.get(session_id)
+        if job is None:
+            job = await self._manager.get_run(session_id)
+        if job is None:
+            raise KeyError(session_id)
+        return job
+
+    async def subscribe(self, session_id: UUID) -> AsyncIterator[RunStatusResponse]:
+        """Yield the current status, then every update until the run finishes."""
+        if session_id not in self._jobs:
+            async for job in self._follow_remote(session_id):
+                yield job
+            return
+        job = self._jobs[session_id]
+        updates: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(session_id, []).append(updates)
+        try:
+            yield job
+            while job.status not in TERMINAL:
+                job = await updates.get()
+                yield job
+        finally:
+            self._subscribers[session_id].remove(updates)
+            if not self._subscribers[session_id]:
+                del self._subscribers[session_id]
+
+    async def _follow_remote(self, session_id: UUID) -> AsyncIterator[RunStatusResponse]:
+        # the run belongs to another worker; all we can see is what it saved
+        job = await self.status(session_id)
+        yield job
+        while job.status not in TERMINAL:
+            await asyncio.sleep(REMOTE_POLL_INTERVAL)
+            try:
+                latest = await self.status(session_id)
+            except KeyError:
+                # deleted mid-run; the stream has started, so end it with a status
+                latest = job.model_copy(update={"status": "failed", "error": "session deleted"})
+            if latest != job:
+                job = latest
+                yield job
+
+    async def _save(self, session_id: UUID, job: RunStatusResponse) -> None:
+        await self._manager.save_run(session_id, job, owner=self._owner, lease=self._lease)
+
+    async def _heartbeat(self) -> None:
+        # renew the lease of every run this worker still holds
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            for session_id in list(self._jobs):
+                # re-read: a run may have finished while an earlier save was awaited, and
+                # saving its stale status would resurrect it
+                job = self._jobs.get(session_id)
+                if job is None:
+                    continue
+                try:
+                    await self._save(session_id, job)
+                except KeyError:
+                    await self.forget(session_id)
+
+    async def _publish(self, session_id: UUID, **changes) -> None:
+        job = self._jobs.get(session_id)
+        if job is None:
+            # forgotten along with its session
+            return
+        job = job.model_copy(update=changes)
+        if job.status in TERMINAL:
+            # from here on `status` reads it back from the session
+            del self._jobs[session_id]
+        else:
+            self._jobs[session_id] = job
+        try:
+            await self._save(session_id, job)
+        except KeyError:
+            # the session was deleted mid-run
+            pass
+        for updates in self._subscribers.get(session_id, []):
+            updates.put_nowait(job)
+
+    async def _worker(self) -> None:
+        while True:
+            session_id = await self._queue.get()
+            try:
+                await self._run(session_id)
+            except Exception as e:
+                await self._publish(session_id, status="failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, session_id: UUID) -> None:
+        await self._publish(session_id, status="running")
+        turns = 0
+        done = (await self._manager.get_session_state(session_id, limit=0, include_hints=False))["done"]
+        while not done:
+            resp = await self._manager.advance_session(session_id)
+            turns += 1
+            done = resp.done
+            await self._publish(session_id, current_round=resp.current_round, turns_completed=turns, done=done)
+        judge = await self._manager.evaluate_session(session_id)
+        await self._publish(session_id, status="completed", judge=judge)
+
+# dependency factory
+_singleton: DebateRunner | None = None
+def get_debate_runner() -> DebateRunner:
+    global _singleton
+    if _singleton is None:
+        _singleton = DebateRunner(get_debate_manager())
+    return _singleton
+
+async def close_debate_runner() -> None:
+    # the runner holds the manager closed alongside it, so the next lifespan builds both afresh
+    global _singleton
+    if _singleton is not None:
+        await _singleton.stop()
+        _singleton = None
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.api.core.config import settings
+
+class LLMResponseCache:
+    """Content-addressed cache of provider responses.
+
+    Entries are keyed on everything that determines the output (model, messages, sampling
+    parameters) and live in an in-memory LRU, optionally backed by a SQLite file so they
+    survive restarts and are shared between worker processes. Both tiers expire entries
+    after ``ttl`` seconds. Values are plain JSON-serialisable dicts.
+    """
+
+    def __init__(self, max_entries: int = settings.llm_cache_max_entries, ttl: float = settings.llm_cache_ttl, path: Optional[str] = settings.llm_cache_path):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA busy_timeout=5000")
+            self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            # each put purges expired rows
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache(expires)")
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    @staticmethod
+    def key(model: str, messages: List[Dict], temperature: float, max_tokens: int, **extra) -> str:
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens, **extra}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value, expires FROM llm_cache WHERE key = ? AND expires > ?", (key, now)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict) -> None:
+        expires = time.time() + self._ttl
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO llm_cache (key, value, expires) VALUES (?, ?, ?)", (key, json.dumps(value), expires))
+                self._db.execute("DELETE FROM llm_cache WHERE expires <= ?", (time.time(),))
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def _remember(self, key: str, expires: float, value: Dict) -> None:
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self._memory),
+            "disk_enabled": self._db is not None,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
@@ -1,7 +1,16 @@
 import asyncio
 import os
-from typing import List, Dict
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import httpx
+from app.api.core import metrics
 from app.api.core.config import settings
+from app.api.services.context_policy import estimate_prompt_tokens
+from app.api.services.llm_cache import LLMResponseCache
+from app.api.services.rate_limit import LatencyTracker, ModelLimiter, model_limits
 
 try:
     import openai
@@ -10,62 +19,476 @@ except Exception:
 
 try:
     from google import genai
+    from google.genai import types as genai_types
 except Exception:
     genai = None
+    genai_types = None
+
+# provider responses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if openai is not None and isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    # openai.APIStatusError carries `status_code`, google.genai errors.APIError carries `code`
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return status in RETRYABLE_STATUS
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if isinstance(response, httpx.Response) else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _openai_response_format(model: str, schema: Optional[Dict]) -> Optional[Dict]:
+    if not schema:
+        return None
+    # structured outputs are gpt-4o family only; older chat models get plain JSON mode,
+    # and snapshots without either rely on the prompt asking for JSON
+    if model.startswith("gpt-4o"):
+        return {"type": "json_schema", "json_schema": {"name": schema.get("title", "reply"), "schema": schema, "strict": True}}
+    if model == "gpt-3.5-turbo" or model.startswith("gpt-4-turbo"):
+        return {"type": "json_object"}
+    return None
+
+def _openai_cache_options(model: str, messages: List[Dict], prefix: int) -> Dict:
+    # OpenAI caches prompt prefixes automatically (gpt-4o family); a key derived from the
+    # stable prefix routes every call sharing it to the same cache
+    if not prefix or not model.startswith("gpt-4o"):
+        return {}
+    return {"prompt_cache_key": LLMResponseCache.key(model, messages[:prefix], 0.0, 0)[:32]}
+
+def _openai_cached_tokens(usage) -> Optional[int]:
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None)
+
+def _gemini_contents(messages: List[Dict]):
+    """Split chat messages into a Gemini system instruction and user/model contents,
+    merging consecutive messages of one role into a single multi-part content."""
+    system = "\n\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "system") or None
+    contents = []
+    for m in messages:
+        role = m.get("role", "user")
+        if role == "system":
+            continue
+        role = "model" if role == "assistant" else "user"
+        part = genai_types.Part(text=str(m.get("content", "")))
+        if contents and contents[-1].role == role:
+            contents[-1].parts.append(part)
+        else:
+            contents.append(genai_types.Content(role=role, parts=[part]))
+    return system, contents
+
+@dataclass
+class LLMResult:
+    text: str
+    # token usage as reported by the provider, when it reports it
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    # served from LLMResponseCache rather than the provider
+    cached: bool = False
+    # prompt tokens the provider read from its own prompt/context cache
+    cached_tokens: Optional[int] = None
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, http_client: httpx.AsyncClient | None = None, cache: LLMResponseCache | None = None):
         # keys: prefer settings, fallback to standard env var names
         self.openai_key = settings.openai_api_key or os.getenv("OPENAI_API_KEY")
         self.gemini_key = settings.gemini_api_key or os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-        if self.openai_key is None and self.gemini_key is None:
-            raise RuntimeError("No LLM API keys found: set OPENAI_API_KEY and/or GOOGLE_API_KEY/GEMINI_API_KEY")
-        # check libs availability
-        if self.openai_key and (openai is None or not hasattr(openai, "OpenAI")):
-            raise RuntimeError("openai>=1.0 is required for GPT calls. Install/upgrade: pip install --upgrade openai")
-        if self.gemini_key and genai is None:
-            raise RuntimeError("google-genai is required for Gemini calls. Install: pip install google-genai")
-
-    async def generate(self, model: str, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 300) -> str:
+        # keys and SDKs are checked when a provider is first called, so the app starts without them
+        # an injected http client (e.g. pointed at a fake provider) is owned by the caller
+        self._owns_http = http_client is None
+        self._http = http_client
+        self._openai = None
+        self._gemini = None
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._model_limiters: Dict[str, ModelLimiter] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        # likewise an injected cache is the caller's to close
+        self._owns_cache = cache is None
+        self.cache = cache if cache is not None else (LLMResponseCache() if settings.llm_cache_enabled else None)
+        # identical cacheable calls already in flight share one provider request
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Gemini context caches by prefix: (task resolving to the cache name, expiry loop time)
+        self._gemini_caches: Dict[str, Tuple[asyncio.Future, float]] = {}
+
+    def _http_client(self) -> httpx.AsyncClient:
+        # one keep-alive pool shared by all providers
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(settings.llm_timeout),
+            )
+        return self._http
+
+    def _openai_client(self):
+        if self._openai is None:
+            if openai is None or not hasattr(openai, "AsyncOpenAI"):
+                raise RuntimeError("openai>=1.0 is required for GPT calls. Install/upgrade: pip install --upgrade openai")
+            self._openai = openai.AsyncOpenAI(
+                api_key=self.openai_key,
+                base_url=settings.openai_api_base,
+                http_client=self._http_client(),
+                # retries are handled in _dispatch so they share the deadline and rate limits
+                max_retries=0,
+            )
+        return self._openai
+
+    def _gemini_client(self):
+        if self._gemini is None:
+            if genai is None:
+                raise RuntimeError("google-genai is required for Gemini calls. Install: pip install google-genai")
+            self._gemini = genai.Client(
+                api_key=self.gemini_key,
+                http_options=genai_types.HttpOptions(httpx_async_client=self._http_client()),
+            )
+        return self._gemini
+
+    def _limit(self, provider: str) -> asyncio.Semaphore:
+        sem = self._limits.get(provider)
+        if sem is None:
+            size = settings.openai_max_concurrency if provider == "openai" else settings.gemini_max_concurrency
+            sem = self._limits[provider] = asyncio.Semaphore(size)
+        return sem
+
+    @asynccontextmanager
+    async def _slot(self, provider: str, model: str):
+        """Hold one of the provider's concurrency slots, timing the wait and the call separately."""
+        sem = self._limit(provider)
+        depth = metrics.LLM_QUEUE_DEPTH.labels(provider)
+        depth.inc()
+        try:
+            with metrics.span("llm_queue"):
+                queued = time.perf_counter()
+                await sem.acquire()
+                metrics.LLM_QUEUE_SECONDS.labels(provider).observe(time.perf_counter() - queued)
+        finally:
+            depth.dec()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            sem.release()
+            elapsed = time.perf_counter() - started
+            metrics.LLM_SECONDS.labels(provider, model).observe(elapsed)
+            metrics.record("provider", elapsed)
+
+    def _limiter(self, model: str) -> ModelLimiter:
+        limiter = self._model_limiters.get(model)
+        if limiter is None:
+            limits = model_limits().get(model, {})
+            # every worker process has its own buckets; split the configured limit between them
+            share = max(1, settings.web_concurrency)
+            limiter = self._model_limiters[model] = ModelLimiter(
+                rpm=limits.get("rpm", settings.llm_default_rpm) / share,
+                tpm=limits.get("tpm", settings.llm_default_tpm) / share,
+            )
+        return limiter
+
+    def _tracker(self, model: str) -> LatencyTracker:
+        return self._latency.setdefault(model, LatencyTracker())
+
+    async def aclose(self) -> None:
+        # drop pooled clients; they are rebuilt lazily if the client is used again
+        http = self._http
+        self._openai = None
+        self._gemini = None
+        self._limits = {}
+        self._model_limiters = {}
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight = {}
+        # provider-side caches are left to expire on their TTL
+        self._gemini_caches = {}
+        if self._owns_cache and self.cache is not None:
+            # its disk tier; the in-memory entries stay usable
+            self.cache.close()
+        if self._owns_http:
+            self._http = None
+            if http is not None:
+                await http.aclose()
+
+    async def generate(self, model: str, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 300, cache: Optional[bool] = None, schema: Optional[Dict] = None, prefix: int = 0) -> str:
+        result = await self.generate_with_usage(model, messages, temperature=temperature, max_tokens=max_tokens, cache=cache, schema=schema, prefix=prefix)
+        return result.text
+
+    async def generate_with_usage(self, model: str, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 300, cache: Optional[bool] = None, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
+        """Generate a reply, consulting the response cache.
+
+        ``cache=None`` caches only deterministic (temperature 0) calls; pass True to cache
+        a sampled call or False to always hit the provider. ``schema`` is a JSON Schema the
+        reply should follow; providers that support it constrain decoding to it, the others
+        only get JSON mode, so callers still have to validate the text. ``prefix`` is the
+        number of leading messages that repeat verbatim across calls, which providers with
+        explicit context caching can cache.
+        """
+        use_cache = self.cache is not None and (cache if cache is not None else temperature == 0.0)
+        if not use_cache:
+            return await self._dispatch(model, messages, temperature, max_tokens, schema, prefix)
+
+        key = self._cache_key(model, messages, temperature, max_tokens, schema)
+        hit = self.cache.get(key)
+        metrics.LLM_CACHE.labels("hit" if hit is not None else "miss").inc()
+        if hit is not None:
+            return LLMResult(**{**hit, "cached": True})
+        pending = self._inflight.get(key)
+        shared = pending is not None
+        if not shared:
+            # the provider call runs in its own task, so a caller that gives up (cancelled,
+            # timed out) leaves the request running for everyone else waiting on it
+            pending = asyncio.ensure_future(self._dispatch_and_cache(key, model, messages, temperature, max_tokens, schema, prefix))
+            # nobody may be left waiting; don't warn about an unretrieved exception
+            pending.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._inflight[key] = pending
+        result = await asyncio.shield(pending)
+        return LLMResult(**{**asdict(result), "cached": True}) if shared else result
+
+    @staticmethod
+    def _cache_key(model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict]) -> str:
+        return LLMResponseCache.key(model, messages, temperature, max_tokens, **({"schema": schema} if schema else {}))
+
+    def uncache(self, model: str, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 300, schema: Optional[Dict] = None) -> None:
+        """Drop a cached reply the caller found unusable, so the next identical call asks again."""
+        if self.cache is not None:
+            self.cache.discard(self._cache_key(model, messages, temperature, max_tokens, schema))
+
+    async def _dispatch_and_cache(self, key: str, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict], prefix: int) -> LLMResult:
+        try:
+            result = await self._dispatch(model, messages, temperature, max_tokens, schema, prefix)
+            self.cache.put(key, asdict(result))
+            return result
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    async def _dispatch(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
+        """One logical call: rate limited, retried with jittered backoff, bounded by a deadline."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.llm_deadline
+        # reserve the prompt plus the whole completion budget against tokens-per-minute
+        tokens = estimate_prompt_tokens(messages) + max_tokens
+        attempt = 0
+        while True:
+            await self._limiter(model).acquire(tokens)
+            remaining = deadline - loop.time()
+            try:
+                return await asyncio.wait_for(
+                    self._hedged(model, messages, temperature, max_tokens, tokens, schema, prefix),
+                    timeout=min(settings.llm_attempt_timeout, remaining),
+                )
+            except Exception as e:
+                metrics.LLM_ERRORS.labels(model, type(e).__name__).inc()
+                if attempt >= settings.llm_max_retries or not _is_retryable(e):
+                    raise
+                backoff = min(settings.llm_retry_max_delay, settings.llm_retry_base_delay * 2 ** attempt)
+                delay = max(_retry_after(e) or 0.0, random.uniform(backoff / 2, backoff))
+                if loop.time() + delay >= deadline:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _hedged(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
+        """Send the request; if enabled and it outlives the model's p95 latency, send a duplicate
+        and return whichever finishes first."""
+        threshold = None
+        if settings.llm_hedge:
+            threshold = self._tracker(model).quantile(settings.llm_hedge_quantile, settings.llm_hedge_min_samples)
+        if threshold is None:
+            return await self._timed(model, messages, temperature, max_tokens, schema, prefix)
+
+        tasks = {asyncio.create_task(self._timed(model, messages, temperature, max_tokens, schema, prefix))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done and self._limiter(model).try_acquire(tokens):
+                tasks.add(asyncio.create_task(self._timed(model, messages, temperature, max_tokens, schema, prefix)))
+            pending, error = tasks, None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _timed(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
+        started = time.monotonic()
+        result = await self._call_provider(model, messages, temperature, max_tokens, schema, prefix)
+        self._tracker(model).observe(time.monotonic() - started)
+        if result.prompt_tokens:
+            metrics.LLM_PROMPT_TOKENS.labels(model).inc(result.prompt_tokens)
+        if result.completion_tokens:
+            metrics.LLM_COMPLETION_TOKENS.labels(model).inc(result.completion_tokens)
+        if result.cached_tokens:
+            metrics.LLM_CACHED_TOKENS.labels(model).inc(result.cached_tokens)
+        return result
+
+    async def _call_provider(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
         lname = model.lower()
         if "gpt" in lname:
-            return await self._call_openai(model, messages, temperature, max_tokens)
+            return await self._call_openai(model, messages, temperature, max_tokens, schema, prefix)
         if "gemini" in lname or "bison" in lname or "text-bison" in lname:
-            return await self._call_gemini(model, messages, temperature, max_tokens)
+            return await self._call_gemini(model, messages, temperature, max_tokens, schema, prefix)
         raise ValueError(f"Unsupported model '{model}'")
 
-    async def _call_openai(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+    async def stream(self, model: str, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 300, usage: Optional[Dict] = None, prefix: int = 0) -> AsyncIterator[str]:
+        """Yield text deltas as the provider produces them.
+
+        If a ``usage`` dict is passed it is filled with ``prompt_tokens`` / ``completion_tokens``
+        / ``cached_tokens`` once the provider reports them (at the end of the stream). Streams honour the model's
+        rate limits but are not retried, since deltas may already have been forwarded.
+        """
+        usage = {} if usage is None else usage
+        await self._limiter(model).acquire(estimate_prompt_tokens(messages) + max_tokens)
+        lname = model.lower()
+        if "gpt" in lname:
+            chunks = self._stream_openai(model, messages, temperature, max_tokens, usage, prefix)
+        elif "gemini" in lname or "bison" in lname or "text-bison" in lname:
+            chunks = self._stream_gemini(model, messages, temperature, max_tokens, usage, prefix)
+        else:
+            raise ValueError(f"Unsupported model '{model}'")
+        async for chunk in chunks:
+            yield chunk
+        if usage.get("prompt_tokens"):
+            metrics.LLM_PROMPT_TOKENS.labels(model).inc(usage["prompt_tokens"])
+        if usage.get("completion_tokens"):
+            metrics.LLM_COMPLETION_TOKENS.labels(model).inc(usage["completion_tokens"])
+        if usage.get("cached_tokens"):
+            metrics.LLM_CACHED_TOKENS.labels(model).inc(usage["cached_tokens"])
+
+    async def _call_openai(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
         if not self.openai_key:
             raise RuntimeError("OPENAI_API_KEY not set")
-        def _sync():
-            client = openai.OpenAI(api_key=self.openai_key)
-            resp = client.chat.completions.create(
+        response_format = _openai_response_format(model, schema)
+        async with self._slot("openai", model):
+            resp = await self._openai_client().chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **({"response_format": response_format} if response_format else {}),
+                **_openai_cache_options(model, messages, prefix),
             )
-            return resp.choices[0].message.content.strip()
-        return await asyncio.to_thread(_sync)
+        usage = resp.usage
+        return LLMResult(
+            text=resp.choices[0].message.content.strip(),
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            cached_tokens=_openai_cached_tokens(usage),
+        )
 
-    async def _call_gemini(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+    async def _call_gemini(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
         if not self.gemini_key:
             raise RuntimeError("GOOGLE_API_KEY or GEMINI_API_KEY not set")
-        # build plaintext prompt from messages
-        parts = []
-        for m in messages:
-            role = m.get("role", "user")
-            content = m.get("content", "")
-            parts.append(f"{role.upper()}: {content}")
-        prompt_text = "\n\n".join(parts)
-
-        def _sync():
-            client = genai.Client(api_key=self.gemini_key)
-            # use models.generate_content for single-turn generation
-            resp = client.models.generate_content(model=model, contents=prompt_text)
-            # modern SDK exposes `text` on response
-            return getattr(resp, "text", str(resp))
-        return await asyncio.to_thread(_sync)
+        contents, config = await self._gemini_request(model, messages, temperature, max_tokens, schema, prefix)
+        async with self._slot("gemini", model):
+            resp = await self._gemini_client().aio.models.generate_content(model=model, contents=contents, config=config)
+        usage = getattr(resp, "usage_metadata", None)
+        return LLMResult(
+            text=(resp.text or "").strip(),
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            completion_tokens=getattr(usage, "candidates_token_count", None),
+            cached_tokens=getattr(usage, "cached_content_token_count", None),
+        )
+
+    async def _gemini_request(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict], prefix: int):
+        """Role-structured contents and generation config for a Gemini call.
+
+        System messages become the system instruction. When the first ``prefix`` messages are
+        served from a context cache, only the remaining ones are sent.
+        """
+        cached = await self._gemini_cached_prefix(model, messages[:prefix]) if prefix else None
+        system, contents = _gemini_contents(messages[prefix:] if cached else messages)
+        config = genai_types.GenerateContentConfig(
+            # a cached prefix already carries the system instruction; the API rejects both
+            system_instruction=None if cached else system,
+            cached_content=cached,
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            **({"response_mime_type": "application/json", "response_json_schema": schema} if schema else {}),
+        )
+        return contents, config
+
+    async def _gemini_cached_prefix(self, model: str, messages: List[Dict]) -> Optional[str]:
+        """Name of a context cache holding ``messages``, created on first use; None if caching is
+        off, the prefix is below the model's minimum, or the provider refused it."""
+        if not settings.gemini_context_cache or estimate_prompt_tokens(messages) < settings.gemini_cache_min_tokens:
+            return None
+        key = LLMResponseCache.key(model, messages, 0.0, 0)
+        now = asyncio.get_running_loop().time()
+        for stale in [k for k, (_, expires) in self._gemini_caches.items() if expires <= now]:
+            del self._gemini_caches[stale]
+        entry = self._gemini_caches.get(key)
+        if entry is None:
+            # concurrent turns of one session share a single create call; entries expire a
+            # little before the provider drops the cache
+            ttl = settings.gemini_cache_ttl
+            entry = (asyncio.ensure_future(self._create_gemini_cache(model, messages)), now + ttl - min(60.0, ttl / 10))
+            self._gemini_caches[key] = entry
+        return await asyncio.shield(entry[0])
+
+    async def _create_gemini_cache(self, model: str, messages: List[Dict]) -> Optional[str]:
+        system, contents = _gemini_contents(messages)
+        try:
+            cache = await self._gemini_client().aio.caches.create(
+                model=model,
+                config=genai_types.CreateCachedContentConfig(
+                    system_instruction=system,
+                    contents=contents,
+                    ttl=f"{int(settings.gemini_cache_ttl)}s",
+                ),
+            )
+        except Exception as e:
+            # e.g. a model without caching support; remembered until the entry expires
+            metrics.LLM_ERRORS.labels(model, type(e).__name__).inc()
+            return None
+        return cache.name
+
+    async def _stream_openai(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, usage: Dict, prefix: int = 0) -> AsyncIterator[str]:
+        if not self.openai_key:
+            raise RuntimeError("OPENAI_API_KEY not set")
+        async with self._slot("openai", model):
+            stream = await self._openai_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                **_openai_cache_options(model, messages, prefix),
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage:
+                    usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                    usage["completion_tokens"] = chunk.usage.completion_tokens
+                    usage["cached_tokens"] = _openai_cached_tokens(chunk.usage)
+
+    async def _stream_gemini(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, usage: Dict, prefix: int = 0) -> AsyncIterator[str]:
+        if not self.gemini_key:
+            raise RuntimeError("GOOGLE_API_KEY or GEMINI_API_KEY not set")
+        contents, config = await self._gemini_request(model, messages, temperature, max_tokens, None, prefix)
+        async with self._slot("gemini", model):
+            stream = await self._gemini_client().aio.models.generate_content_stream(model=model, contents=contents, config=config)
+            async for chunk in stream:
+                if getattr(chunk, "text", None):
+                    yield chunk.text
+                meta = getattr(chunk, "usage_metadata", None)
+                if meta is not None and meta.prompt_token_count is not None:
+                    usage["prompt_tokens"] = meta.prompt_token_count
+                    usage["completion_tokens"] = meta.candidates_token_count
+                    usage["cached_tokens"] = meta.cached_content_token_count
 
 # singleton factory
 _singleton: LLMClient | None = None
@@ -73,4 +496,11 @@ def get_llm_client() -> LLMClient:
     global _singleton
     if _singleton is None:
         _singleton = LLMClient()
-    return _singleton
\ No newline at end of file
+    return _singleton
+
+async def close_llm_client() -> None:
+    # aclose also closes the owned cache's disk tier, so the next lifespan builds a new client
+    global _singleton
+    if _singleton is not None:
+        await _singleton.aclose()
+        _singleton = None
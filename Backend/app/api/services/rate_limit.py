@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from app.api.core.config import settings
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` units per second."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        self._refill()
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return True
+        return False
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # a request larger than the bucket would never fit; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        # waiters are served in FIFO order
+        async with self._lock:
+            while not self.try_acquire(amount):
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+class ModelLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for one model. A limit of 0 disables it."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, tokens: int) -> None:
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.tokens is not None:
+            await self.tokens.acquire(tokens)
+
+    def try_acquire(self, tokens: int) -> bool:
+        # used for optional extra requests (hedges), which should never queue
+        if self.requests is not None and not self.requests.try_acquire():
+            return False
+        if self.tokens is not None and not self.tokens.try_acquire(tokens):
+            return False
+        return True
+
+def model_limits() -> Dict[str, Dict[str, float]]:
+    """Per-model overrides from LLM_RATE_LIMITS, e.g. '{"gpt-4": {"rpm": 500, "tpm": 30000}}'."""
+    return json.loads(settings.llm_rate_limits) if settings.llm_rate_limits else {}
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one model."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
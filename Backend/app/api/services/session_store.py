@@ -0,0 +1,357 @@
+import dataclasses
+import json
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from app.api.core.config import settings
+from app.api.v1.schemas import Statement
+
+DEFAULT_JUDGE_INSTRUCTIONS = "Read the full debate transcript and decide the winner based on strength of arguments and persuasiveness."
+
+@dataclass(slots=True)
+class Turn:
+    """One committed statement. ``text`` is the raw model output; the
+    "(round N)Speaker: " prefix clients see is added by ``line``/``render``."""
+    speaker: str
+    round: int
+    text: str
+
+    def line(self) -> str:
+        return f"(round {self.round}){self.speaker}: {self.text}"
+
+    def render(self) -> Statement:
+        return Statement(speaker=self.speaker, text=self.line(), round=self.round)
+
+    @classmethod
+    def from_statement(cls, st: Statement) -> "Turn":
+        # statements echoed back by clients carry the rendered prefix; store the text once
+        prefix = f"(round {st.round}){st.speaker}: "
+        text = st.text[len(prefix):] if st.text.startswith(prefix) else st.text
+        return cls(speaker=st.speaker, round=st.round, text=text)
+
+@dataclass(slots=True)
+class SessionRecord:
+    """Everything stored for one debate session."""
+    model_a: str
+    model_b: str
+    topic: str
+    current_turn: str
+    max_rounds: int
+    model_a_model: str = "gpt-3.5-turbo"
+    model_b_model: str = "gpt-3.5-turbo"
+    model_a_stance: Optional[str] = "Argue in favor"
+    model_b_stance: Optional[str] = "Argue against"
+    judge_name: Optional[str] = "Judge"
+    judge_model: Optional[str] = "JudgeAI"
+    judge_model_model: Optional[str] = "gpt-4"
+    judge_instructions: Optional[str] = DEFAULT_JUDGE_INSTRUCTIONS
+    current_round: int = 1
+    done: bool = False
+    context_policy: str = "full"
+    # pre-generate the next turn after each commit (see DebateManager._speculate)
+    speculate: bool = False
+    # rolling summary of the first `summary_upto` statements (summary policy only)
+    summary: Optional[str] = None
+    summary_upto: int = 0
+    # latest server-side run status (RunStatusResponse as JSON), so every worker can report it
+    run: Optional[Dict] = None
+    transcript: List[Turn] = field(default_factory=list)
+
+    def __post_init__(self):
+        # names and models repeat across every session and turn; share one copy of each
+        for name in ("model_a", "model_b", "current_turn", "model_a_model", "model_b_model", "judge_model_model", "context_policy"):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                setattr(self, name, sys.intern(value))
+
+    def model_for(self, speaker: str) -> str:
+        return self.model_a_model if speaker == self.model_a else self.model_b_model
+
+    def stance_for(self, speaker: str) -> Optional[str]:
+        return self.model_a_stance if speaker == self.model_a else self.model_b_stance
+
+    def fields(self) -> Dict:
+        """All fields except the transcript, e.g. for serialisation."""
+        return {f.name: getattr(self, f.name) for f in dataclasses.fields(self) if f.name != "transcript"}
+
+class SessionConflict(RuntimeError):
+    """Another writer committed a turn to the session since it was read."""
+
+class SessionStore(ABC):
+    """Persistence for debate sessions.
+
+    ``get`` returns the SessionRecord with its transcript of Turns and raises KeyError for
+    unknown or expired sessions. Callers must treat it as read-only and write through
+    ``update``/``append``/``commit_turn``; stores may hand out their live record or a fresh copy.
+    Stores whose calls can block (disk, network) set ``blocking`` and are then called off
+    the event loop.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def create(self, session_id: UUID, record: SessionRecord) -> None: ...
+
+    @abstractmethod
+    def get(self, session_id: UUID) -> SessionRecord: ...
+
+    @abstractmethod
+    def update(self, session_id: UUID, **fields) -> None: ...
+
+    @abstractmethod
+    def append(self, session_id: UUID, turns: List[Turn]) -> None: ...
+
+    @abstractmethod
+    def commit_turn(self, session_id: UUID, turn: Turn, expected: int, **changes) -> None:
+        """Append ``turn`` and apply ``changes`` in one step, provided the transcript still
+        holds ``expected`` turns; raise SessionConflict if another writer got there first."""
+
+    @abstractmethod
+    def delete(self, session_id: UUID) -> None: ...
+
+    def get_page(self, session_id: UUID, cursor: int = 0, since_round: Optional[int] = None, limit: Optional[int] = None) -> Tuple[SessionRecord, List[Turn], int, int]:
+        """Return (record, turns, next_cursor, total) for a window of the transcript.
+
+        ``cursor`` is a statement index; statements from ``since_round`` onwards are kept,
+        at most ``limit`` of them. ``next_cursor`` is the index to resume from: past the
+        last statement returned, or past the end when the filter left nothing, but never
+        past statements a ``limit`` of 0 held back. The record's own transcript may be left
+        empty.
+        """
+        session = self.get(session_id)
+        transcript = session.transcript
+        page = [
+            (i, st) for i, st in enumerate(islice(transcript, cursor, None), start=cursor)
+            if since_round is None or st.round >= since_round
+        ]
+        if limit is not None:
+            page = page[:limit]
+        next_cursor = page[-1][0] + 1 if page else cursor if limit == 0 else max(cursor, len(transcript))
+        return session, [st for _, st in page], next_cursor, len(transcript)
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of live sessions; used for metrics."""
+
+    def close(self) -> None:
+        pass
+
+class InMemorySessionStore(SessionStore):
+    """Per-process store bounded by an LRU size cap and an idle TTL."""
+
+    def __init__(self, max_sessions: int = settings.session_max, ttl: float = settings.session_ttl):
+        self._max_sessions = max_sessions
+        self._ttl = ttl
+        self._sessions: "OrderedDict[UUID, SessionRecord]" = OrderedDict()
+        self._touched: Dict[UUID, float] = {}
+
+    def _live(self, session_id: UUID) -> SessionRecord:
+        session = self._sessions[session_id]
+        now = time.monotonic()
+        if self._ttl and now - self._touched[session_id] > self._ttl:
+            self.delete(session_id)
+            raise KeyError(session_id)
+        self._sessions.move_to_end(session_id)
+        self._touched[session_id] = now
+        return session
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        # oldest entries sit at the front of the LRU order
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            expired = self._ttl and now - self._touched[oldest] > self._ttl
+            if not expired and len(self._sessions) <= self._max_sessions:
+                break
+            self.delete(oldest)
+
+    def create(self, session_id: UUID, record: SessionRecord) -> None:
+        self._sessions[session_id] = record
+        self._touched[session_id] = time.monotonic()
+        self._evict()
+
+    def get(self, session_id: UUID) -> SessionRecord:
+        return self._live(session_id)
+
+    def update(self, session_id: UUID, **fields) -> None:
+        record = self._live(session_id)
+        for name, value in fields.items():
+            setattr(record, name, value)
+
+    def append(self, session_id: UUID, turns: List[Turn]) -> None:
+        self._live(session_id).transcript.extend(turns)
+
+    def commit_turn(self, session_id: UUID, turn: Turn, expected: int, **changes) -> None:
+        record = self._live(session_id)
+        if len(record.transcript) != expected:
+            raise SessionConflict(session_id)
+        record.transcript.append(turn)
+        for name, value in changes.items():
+            setattr(record, name, value)
+
+    def delete(self, session_id: UUID) -> None:
+        self._sessions.pop(session_id, None)
+        self._touched.pop(session_id, None)
+
+    def count(self) -> int:
+        return len(self._sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite store in WAL mode, safe to share between worker processes on one host.
+
+    Session fields live in one JSON column; turns are rows appended per turn.
+    """
+
+    # writes wait up to busy_timeout for other workers' locks
+    blocking = True
+
+    def __init__(self, path: str, ttl: float = settings.session_ttl):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, fields TEXT NOT NULL, touched REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS statements ("
+            "session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE, "
+            "seq INTEGER NOT NULL, speaker TEXT NOT NULL, text TEXT NOT NULL, round INTEGER NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_touched ON sessions(touched)")
+
+    def _record(self, session_id: UUID) -> SessionRecord:
+        row = self._db.execute("SELECT fields, touched FROM sessions WHERE id = ?", (str(session_id),)).fetchone()
+        if row is None or (self._ttl and time.time() - row[1] > self._ttl):
+            raise KeyError(session_id)
+        return SessionRecord(**json.loads(row[0]))
+
+    def _live(self, session_id: UUID) -> SessionRecord:
+        record = self._record(session_id)
+        # reads keep a session alive, as in InMemorySessionStore
+        self._db.execute("UPDATE sessions SET touched = ? WHERE id = ?", (time.time(), str(session_id)))
+        return record
+
+    def create(self, session_id: UUID, record: SessionRecord) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT INTO sessions (id, fields, touched) VALUES (?, ?, ?)", (str(session_id), json.dumps(record.fields()), now))
+            if self._ttl:
+                self._db.execute("DELETE FROM sessions WHERE touched < ?", (now - self._ttl,))
+
+    def get(self, session_id: UUID) -> SessionRecord:
+        with self._lock:
+            record = self._live(session_id)
+            rows = self._db.execute(
+                "SELECT speaker, text, round FROM statements WHERE session_id = ? ORDER BY seq", (str(session_id),)
+            ).fetchall()
+        record.transcript = [Turn(speaker=sp, round=rd, text=tx) for sp, tx, rd in rows]
+        return record
+
+    def get_page(self, session_id: UUID, cursor: int = 0, since_round: Optional[int] = None, limit: Optional[int] = None) -> Tuple[SessionRecord, List[Turn], int, int]:
+        with self._lock:
+            record = self._live(session_id)
+            rows = self._db.execute(
+                "SELECT seq, speaker, text, round FROM statements WHERE session_id = ? AND seq >= ? AND round >= ? "
+                "ORDER BY seq LIMIT ?",
+                (str(session_id), cursor, since_round if since_round is not None else 0, limit if limit is not None else -1),
+            ).fetchall()
+            total = self._db.execute("SELECT COUNT(*) FROM statements WHERE session_id = ?", (str(session_id),)).fetchone()[0]
+        next_cursor = rows[-1][0] + 1 if rows else cursor if limit == 0 else max(cursor, total)
+        return record, [Turn(speaker=sp, round=rd, text=tx) for _, sp, tx, rd in rows], next_cursor, total
+
+    def update(self, session_id: UUID, **changes) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                record = self._record(session_id)
+                for name, value in changes.items():
+                    setattr(record, name, value)
+                self._db.execute(
+                    "UPDATE sessions SET fields = ?, touched = ? WHERE id = ?",
+                    (json.dumps(record.fields()), time.time(), str(session_id)),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def append(self, session_id: UUID, turns: List[Turn]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._record(session_id)
+                start = self._db.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM statements WHERE session_id = ?", (str(session_id),)
+                ).fetchone()[0]
+                self._db.executemany(
+                    "INSERT INTO statements (session_id, seq, speaker, text, round) VALUES (?, ?, ?, ?, ?)",
+                    [(str(session_id), start + i, t.speaker, t.text, t.round) for i, t in enumerate(turns)],
+                )
+                self._db.execute("UPDATE sessions SET touched = ? WHERE id = ?", (time.time(), str(session_id)))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def commit_turn(self, session_id: UUID, turn: Turn, expected: int, **changes) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                record = self._record(session_id)
+                for name, value in changes.items():
+                    setattr(record, name, value)
+                total = self._db.execute("SELECT COUNT(*) FROM statements WHERE session_id = ?", (str(session_id),)).fetchone()[0]
+                if total != expected:
+                    raise SessionConflict(session_id)
+                self._db.execute(
+                    "INSERT INTO statements (session_id, seq, speaker, text, round) VALUES (?, ?, ?, ?, ?)",
+                    (str(session_id), expected, turn.speaker, turn.text, turn.round),
+                )
+                self._db.execute(
+                    "UPDATE sessions SET fields = ?, touched = ? WHERE id = ?",
+                    (json.dumps(record.fields()), time.time(), str(session_id)),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: UUID) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (str(session_id),))
+
+    def count(self) -> int:
+        cutoff = time.time() - self._ttl if self._ttl else 0
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions WHERE touched >= ?", (cutoff,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+def create_session_store(url: Optional[str] = None) -> SessionStore:
+    """Build a store from a URL: ``memory://`` or ``sqlite:///path/to/sessions.db``."""
+    url = url or settings.session_store_url
+    if url.startswith("memory://"):
+        if settings.web_concurrency > 1:
+            raise ValueError("memory:// sessions are private to one worker; use sqlite:///path with WEB_CONCURRENCY > 1")
+        return InMemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    # a Redis-compatible backend plugs in here, e.g. "redis://host:6379/0"
+    raise ValueError(f"Unsupported session store '{url}'")
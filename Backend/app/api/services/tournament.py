@@ -0,0 +1,152 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+from app.api.core.config import settings
+from app.api.v1.schemas import LeaderboardEntry, TournamentMatchResult, TournamentRequest
+from app.api.services.debate_manager import ALLOWED_MODELS, DebateManager
+
+# debater names used inside tournament sessions; the judge answers with one of these
+SIDE_A = "ModelA"
+SIDE_B = "ModelB"
+
+ELO_START = 1000.0
+ELO_K = 32.0
+
+class Leaderboard:
+    """Win/loss/tie tallies and Elo ratings, updated one match at a time in finishing order."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, model: str) -> Dict[str, float]:
+        return self._stats.setdefault(model, {"games": 0, "wins": 0, "losses": 0, "ties": 0, "elo": ELO_START})
+
+    def record(self, model_a: str, model_b: str, winner: str) -> None:
+        a, b = self._entry(model_a), self._entry(model_b)
+        score_a = 1.0 if winner == model_a else 0.0 if winner == model_b else 0.5
+        expected_a = 1.0 / (1.0 + 10 ** ((b["elo"] - a["elo"]) / 400.0))
+        delta = ELO_K * (score_a - expected_a)
+        a["elo"] += delta
+        b["elo"] -= delta
+        for entry, score in ((a, score_a), (b, 1.0 - score_a)):
+            entry["games"] += 1
+            entry["wins" if score == 1.0 else "losses" if score == 0.0 else "ties"] += 1
+
+    def entries(self) -> List[LeaderboardEntry]:
+        rows = [
+            LeaderboardEntry(
+                model=model,
+                games=int(st["games"]),
+                wins=int(st["wins"]),
+                losses=int(st["losses"]),
+                ties=int(st["ties"]),
+                win_rate=(st["wins"] + 0.5 * st["ties"]) / st["games"],
+                elo=round(st["elo"], 1),
+            )
+            for model, st in self._stats.items()
+        ]
+        return sorted(rows, key=lambda r: r.elo, reverse=True)
+
+class TournamentRunner:
+    """Plays every topic x pairing x stance combination concurrently and judges each debate.
+
+    Provider-level concurrency is still capped by LLMClient; ``concurrency`` bounds how many
+    debates are in progress at once.
+    """
+
+    def __init__(self, manager: DebateManager, concurrency: Optional[int] = None):
+        self._manager = manager
+        self._concurrency = concurrency or settings.tournament_concurrency
+        self.leaderboard = Leaderboard()
+
+    @staticmethod
+    def matches(req: TournamentRequest) -> List[TournamentMatchResult]:
+        pairings = [(p.model_a_model, p.model_b_model) for p in req.pairings]
+        if req.swap_sides:
+            pairings += [(b, a) for a, b in pairings if a != b]
+        matches = [
+            TournamentMatchResult(
+                topic=topic,
+                model_a_model=a,
+                model_b_model=b,
+                model_a_stance=st.model_a_stance,
+                model_b_stance=st.model_b_stance,
+            )
+            for topic in req.topics
+            for a, b in pairings
+            for st in req.stances
+        ]
+        if not matches:
+            raise ValueError("tournament needs at least one topic, pairing and stance")
+        if len(matches) > settings.tournament_max_matches:
+            raise ValueError(f"tournament has {len(matches)} matches, limit is {settings.tournament_max_matches}")
+        models = {m.model_a_model for m in matches} | {m.model_b_model for m in matches} | {req.judge_model_model}
+        if not models <= ALLOWED_MODELS:
+            raise ValueError(f"model must be one of: {sorted(ALLOWED_MODELS)}")
+        return matches
+
+    async def run(self, req: TournamentRequest) -> AsyncIterator[TournamentMatchResult]:
+        """Yield each match result as soon as its debate has been judged."""
+        matches = self.matches(req)
+        gate = asyncio.Semaphore(min(req.concurrency or self._concurrency, settings.tournament_max_concurrency))
+
+        async def play(match: TournamentMatchResult) -> TournamentMatchResult:
+            async with gate:
+                return await self._play(match, req)
+
+        tasks = [asyncio.create_task(play(m)) for m in matches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                # self-play says nothing about relative strength
+                if result.winner is not None and result.model_a_model != result.model_b_model:
+                    self.leaderboard.record(result.model_a_model, result.model_b_model, result.winner)
+                yield result
+        finally:
+            # the consumer went away (e.g. client disconnected): stop the remaining debates
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _play(self, match: TournamentMatchResult, req: TournamentRequest) -> TournamentMatchResult:
+        session_id = None
+        try:
+            session_id, _ = await self._manager.create_session(
+                model_a=SIDE_A,
+                model_b=SIDE_B,
+                starting_turn=SIDE_A,
+                topic=match.topic,
+                max_rounds=req.max_rounds,
+                model_a_model=match.model_a_model,
+                model_b_model=match.model_b_model,
+                model_a_stance=match.model_a_stance,
+                model_b_stance=match.model_b_stance,
+                judge_model_model=req.judge_model_model,
+                judge_instructions=req.judge_instructions,
+            )
+            if req.keep_sessions:
+                match = match.model_copy(update={"session_id": session_id})
+            done = False
+            while not done:
+                done = (await self._manager.advance_session(session_id)).done
+            judge = await self._manager.evaluate_session(session_id)
+        except Exception as e:
+            return match.model_copy(update={"error": str(e)})
+        finally:
+            # a large tournament would otherwise fill the store and evict interactive sessions
+            if session_id is not None and not req.keep_sessions:
+                try:
+                    await self._manager.delete_session(session_id)
+                except KeyError:
+                    pass
+        return match.model_copy(update={"judge": judge, "winner": self._winner(judge.winner, match)})
+
+    @staticmethod
+    def _winner(verdict: Optional[str], match: TournamentMatchResult) -> Optional[str]:
+        verdict = (verdict or "").strip().strip(".").lower()
+        if verdict == SIDE_A.lower():
+            return match.model_a_model
+        if verdict == SIDE_B.lower():
+            return match.model_b_model
+        if verdict == "tie":
+            return "Tie"
+        return None
@@ -1,9 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from uuid import UUID
+from app.api.core import metrics
 from app.api.v1 import schemas as s
 from app.api.services.debate_manager import get_debate_manager, DebateManager
+from app.api.services.debate_runner import get_debate_runner, DebateRunner
+from app.api.services.llm_client import get_llm_client, LLMClient
+from app.api.services.session_store import SessionConflict
+from app.api.services.tournament import TournamentRunner
 
 router = APIRouter()
+# mounted without the /v1 prefix so scrapers find it at /metrics
+metrics_router = APIRouter()
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+def _failed(status_code: int, e: Exception, detail: Optional[str] = None) -> HTTPException:
+    # every request that fails on an exception is counted by its type
+    metrics.ERRORS.labels(type(e).__name__).inc()
+    return HTTPException(status_code=status_code, detail=detail or str(e))
 
 @router.post("/debate/turn", response_model=s.DebateTurnResponse)
 async def debate_turn(req: s.DebateTurnRequest, manager: DebateManager = Depends(get_debate_manager)):
@@ -16,15 +34,20 @@ async def debate_turn(req: s.DebateTurnRequest, manager: DebateManager = Depends
             previous_conversation=req.previous_conversation or [],
             current_round=req.current_round,
             max_rounds=req.max_rounds,
+            model_a_model=req.model_a_model,
+            model_b_model=req.model_b_model,
+            model_a_stance=req.model_a_stance,
+            model_b_stance=req.model_b_stance,
+            context_policy=req.context_policy,
         )
         return resp
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise _failed(400, e)
 
 @router.post("/debate/session", response_model=s.SessionCreateResponse)
 async def create_session(req: s.SessionCreateRequest, manager: DebateManager = Depends(get_debate_manager)):
     try:
-        session_id, state = manager.create_session(
+        session_id, state = await manager.create_session(
             model_a=req.model_a,
             model_b=req.model_b,
             starting_turn=req.starting_turn,
@@ -38,32 +61,163 @@ async def create_session(req: s.SessionCreateRequest, manager: DebateManager = D
             judge_model=req.judge_model,
             judge_model_model=req.judge_model_model,
             judge_instructions=req.judge_instructions,
+            context_policy=req.context_policy,
+            speculate=req.speculate,
         )
         return s.SessionCreateResponse(session_id=session_id, state=state)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise _failed(400, e)
 
 @router.post("/debate/session/{session_id}/advance", response_model=s.DebateTurnResponse)
-async def advance_session(session_id: UUID, manager: DebateManager = Depends(get_debate_manager)):
+async def advance_session(
+    session_id: UUID,
+    cursor: Optional[int] = Query(None, ge=0, description="only return statements after this cursor"),
+    since_round: Optional[int] = Query(None, ge=1, description="only return statements from this round on"),
+    include_hints: bool = True,
+    trace: bool = Query(False, description="report per-phase timings in the body and a Server-Timing header"),
+    manager: DebateManager = Depends(get_debate_manager),
+):
+    with metrics.Trace() as t:
+        try:
+            resp = await manager.advance_session(session_id, cursor=cursor, since_round=since_round, include_hints=include_hints)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="session not found")
+        except SessionConflict as e:
+            raise _failed(409, e, "session was advanced concurrently, retry")
+        except Exception as e:
+            raise _failed(400, e)
+        with metrics.span("serialize"):
+            body = resp.model_dump_json()
+    if not trace:
+        return Response(body, media_type="application/json")
+    resp.timings = t.timings_ms()
+    return Response(resp.model_dump_json(), media_type="application/json", headers={"Server-Timing": t.server_timing()})
+
+@router.post("/debate/session/{session_id}/advance/stream")
+async def advance_session_stream(
+    session_id: UUID,
+    cursor: Optional[int] = Query(None, ge=0),
+    since_round: Optional[int] = Query(None, ge=1),
+    include_hints: bool = True,
+    manager: DebateManager = Depends(get_debate_manager),
+):
+    """Server-Sent Events variant of advance: `token` events carry text deltas,
+    a final `turn` event carries the committed DebateTurnResponse."""
     try:
-        return await manager.advance_session(session_id)
+        chunks = await manager.stream_advance_session(session_id, cursor=cursor, since_round=since_round, include_hints=include_hints)
     except KeyError:
         raise HTTPException(status_code=404, detail="session not found")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            async for chunk in chunks:
+                if isinstance(chunk, str):
+                    yield _sse("token", json.dumps({"text": chunk}))
+                else:
+                    yield _sse("turn", chunk.model_dump_json())
+        except Exception as e:
+            metrics.ERRORS.labels(type(e).__name__).inc()
+            yield _sse("error", json.dumps({"detail": str(e)}))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @router.get("/debate/session/{session_id}", response_model=s.SessionStateResponse)
-async def get_session(session_id: UUID, manager: DebateManager = Depends(get_debate_manager)):
+async def get_session(
+    session_id: UUID,
+    cursor: int = Query(0, ge=0, description="statement index to start from"),
+    since_round: Optional[int] = Query(None, ge=1, description="only return statements from this round on"),
+    limit: Optional[int] = Query(None, ge=0, description="max statements to return"),
+    include_hints: bool = True,
+    manager: DebateManager = Depends(get_debate_manager),
+):
+    try:
+        return await manager.get_session_state(session_id, cursor=cursor, since_round=since_round, limit=limit, include_hints=include_hints)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="session not found")
+
+@router.delete("/debate/session/{session_id}", status_code=204)
+async def delete_session(session_id: UUID, manager: DebateManager = Depends(get_debate_manager), runner: DebateRunner = Depends(get_debate_runner)):
     try:
-        return manager.get_session_state(session_id)
+        await manager.delete_session(session_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="session not found")
+    await runner.forget(session_id)
 
 @router.post("/debate/session/{session_id}/judge", response_model=s.JudgeResponse)
-async def judge_session(session_id: UUID, manager: DebateManager = Depends(get_debate_manager)):
+async def judge_session(session_id: UUID, req: Optional[s.JudgeRequest] = None, manager: DebateManager = Depends(get_debate_manager)):
+    req = req or s.JudgeRequest()
     try:
-        return await manager.evaluate_session(session_id)
+        return await manager.evaluate_session(session_id, judge_models=req.judge_models, timeout=req.timeout)
     except KeyError:
         raise HTTPException(status_code=404, detail="session not found")
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise _failed(400, e)
+
+@router.post("/debate/session/{session_id}/run", response_model=s.RunStatusResponse, status_code=202)
+async def run_session(session_id: UUID, runner: DebateRunner = Depends(get_debate_runner)):
+    """Queue the session to be played to the end and judged server-side."""
+    try:
+        return await runner.submit(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="session not found")
+    except RuntimeError as e:
+        raise _failed(503, e)
+
+@router.get("/debate/session/{session_id}/run", response_model=s.RunStatusResponse)
+async def get_run_status(session_id: UUID, runner: DebateRunner = Depends(get_debate_runner)):
+    try:
+        return await runner.status(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="run not found")
+
+@router.get("/debate/session/{session_id}/run/events")
+async def run_events(session_id: UUID, runner: DebateRunner = Depends(get_debate_runner)):
+    """Server-Sent Events stream of `status` updates until the run completes or fails."""
+    try:
+        await runner.status(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="run not found")
+
+    async def events():
+        async for status in runner.subscribe(session_id):
+            yield _sse("status", status.model_dump_json())
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/llm/cache")
+async def llm_cache_stats(llm: LLMClient = Depends(get_llm_client)):
+    """Hit/miss counters for the LLM response cache."""
+    if llm.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm.cache.stats()}
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(manager: DebateManager = Depends(get_debate_manager), runner: DebateRunner = Depends(get_debate_runner)):
+    """Prometheus text exposition of request, phase and LLM metrics."""
+    metrics.ACTIVE_SESSIONS.set(await manager.session_count())
+    metrics.RUNNER_QUEUE_DEPTH.set(runner.queue_depth())
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.post("/tournament", response_model=s.TournamentResponse)
+async def run_tournament(req: s.TournamentRequest, stream: bool = False, manager: DebateManager = Depends(get_debate_manager)):
+    """Play topics x pairings x stances concurrently, judge every debate and rank the models.
+
+    With ?stream=true the response is Server-Sent Events: a `match` event per finished
+    debate and a final `leaderboard` event.
+    """
+    runner = TournamentRunner(manager)
+    try:
+        runner.matches(req)
+    except ValueError as e:
+        raise _failed(400, e)
+
+    if not stream:
+        matches = [m async for m in runner.run(req)]
+        return s.TournamentResponse(matches=matches, leaderboard=runner.leaderboard.entries())
+
+    async def events():
+        async for match in runner.run(req):
+            yield _sse("match", match.model_dump_json())
+        yield _sse("leaderboard", json.dumps([e.model_dump() for e in runner.leaderboard.entries()]))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict
 from uuid import UUID
 
 class Statement(BaseModel):
@@ -15,6 +15,11 @@ class DebateTurnRequest(BaseModel):
     previous_conversation: Optional[List[Statement]] = []
     current_round: int = 1
     max_rounds: int = 3
+    model_a_model: Optional[str] = "gpt-3.5-turbo"
+    model_b_model: Optional[str] = "gpt-3.5-turbo"
+    model_a_stance: Optional[str] = "Argue in favor"
+    model_b_stance: Optional[str] = "Argue against"
+    context_policy: Optional[str] = None
 
 class DebateTurnResponse(BaseModel):
     next_turn: str
@@ -22,6 +27,13 @@ class DebateTurnResponse(BaseModel):
     done: bool
     updated_conversation: List[Statement]
     message: Optional[str] = None
+    # number of committed statements; send it back as ?cursor= to get only newer ones
+    cursor: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    # prompt tokens the provider served from its prompt cache, when it reports them
+    cached_tokens: Optional[int] = None
+    # per-phase milliseconds, only filled when the request asked for ?trace=true
+    timings: Optional[Dict[str, float]] = None
 
 class SessionCreateRequest(BaseModel):
     model_a: str
@@ -38,6 +50,10 @@ class SessionCreateRequest(BaseModel):
     judge_model: Optional[str] = "JudgeAI"
     judge_model_model: Optional[str] = "gpt-4"
     judge_instructions: Optional[str] = "Read the full debate transcript and decide the winner based on the strength of arguments and persuasiveness."
+    # full | last_k | token_budget | summary; defaults to the server's CONTEXT_POLICY
+    context_policy: Optional[str] = None
+    # pre-generate each next turn in the background; defaults to the server's SPECULATIVE_TURNS
+    speculate: Optional[bool] = None
 
 class SessionCreateResponse(BaseModel):
     session_id: UUID
@@ -55,13 +71,101 @@ class SessionStateResponse(BaseModel):
     judge_model: Optional[str]
     judge_model_model: Optional[str]
     judge_instructions: Optional[str]
+    context_policy: Optional[str] = None
+    speculate: bool = False
     current_turn: str
     current_round: int
     max_rounds: int
     done: bool
     transcript: List[Statement]
+    # index to pass as ?cursor= for the next page
+    cursor: Optional[int] = None
+
+class JudgeRequest(BaseModel):
+    # judge models to poll concurrently; defaults to the session's judge_model_model
+    judge_models: Optional[List[str]] = None
+    # per-judge timeout in seconds
+    timeout: Optional[float] = None
+
+class JudgeOutput(BaseModel):
+    # the JSON object judge models are asked to reply with
+    winner: str
+    # criterion -> debater -> score out of 10
+    criteria: Dict[str, Dict[str, float]] = {}
+    reasoning: str = ""
+
+class JudgeVerdict(BaseModel):
+    judge_model: str
+    winner: Optional[str] = None
+    reasoning: Optional[str] = None
+    criteria: Optional[Dict[str, Dict[str, float]]] = None
+    error: Optional[str] = None
+    latency_ms: Optional[float] = None
+    prompt_tokens: Optional[int] = None
 
 class JudgeResponse(BaseModel):
     winner: Optional[str]
     reasoning: str
-    scores: Optional[Dict[str, float]] = None
\ No newline at end of file
+    # share of the valid judge votes per candidate
+    scores: Optional[Dict[str, float]] = None
+    # per-criterion scores out of 10, averaged over the judges that gave them
+    criteria: Optional[Dict[str, Dict[str, float]]] = None
+    prompt_tokens: Optional[int] = None
+    panel: Optional[List[JudgeVerdict]] = None
+
+class RunStatusResponse(BaseModel):
+    session_id: UUID
+    status: Literal["queued", "running", "completed", "failed"]
+    current_round: int
+    turns_completed: int = 0
+    done: bool = False
+    judge: Optional[JudgeResponse] = None
+    error: Optional[str] = None
+
+class TournamentPairing(BaseModel):
+    model_a_model: str
+    model_b_model: str
+
+class TournamentStances(BaseModel):
+    model_a_stance: str = "Argue in favor"
+    model_b_stance: str = "Argue against"
+
+class TournamentRequest(BaseModel):
+    topics: List[str]
+    pairings: List[TournamentPairing]
+    stances: List[TournamentStances] = [TournamentStances()]
+    max_rounds: int = Field(3, ge=1)
+    # also play every pairing with the two models' sides swapped
+    swap_sides: bool = False
+    judge_model_model: str = "gpt-4"
+    judge_instructions: Optional[str] = "Read the full debate transcript and decide the winner based on the strength of arguments and persuasiveness."
+    # debates played at once; capped at the server's TOURNAMENT_MAX_CONCURRENCY
+    concurrency: Optional[int] = Field(None, ge=1)
+    # keep each match's session (and report its id) instead of deleting it once judged
+    keep_sessions: bool = False
+
+class TournamentMatchResult(BaseModel):
+    # only set when the request keeps sessions
+    session_id: Optional[UUID] = None
+    topic: str
+    model_a_model: str
+    model_b_model: str
+    model_a_stance: str
+    model_b_stance: str
+    # winning model name, "Tie", or None if the judge gave no usable verdict
+    winner: Optional[str] = None
+    judge: Optional[JudgeResponse] = None
+    error: Optional[str] = None
+
+class LeaderboardEntry(BaseModel):
+    model: str
+    games: int
+    wins: int
+    losses: int
+    ties: int
+    win_rate: float
+    elo: float
+
+class TournamentResponse(BaseModel):
+    matches: List[TournamentMatchResult]
+    leaderboard: List[LeaderboardEntry]
@@ -1,16 +1,51 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.core import metrics
 from app.api.v1 import routes
+from app.api.services.llm_client import close_llm_client
+from app.api.services.debate_manager import close_debate_manager, get_debate_manager
+from app.api.services.debate_runner import close_debate_runner
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # services are built here, once per worker process, rather than at import time;
+    # a misconfigured session store fails startup instead of the first request
+    get_debate_manager()
+    yield
+    await close_debate_runner()
+    close_debate_manager()
+    # release pooled provider connections
+    await close_llm_client()
+
+async def record_http_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    except Exception as e:
+        metrics.ERRORS.labels(type(e).__name__).inc()
+        raise
+    finally:
+        # label by path template, not the raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.HTTP_SECONDS.labels(request.method, path, str(status)).observe(time.perf_counter() - start)
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="AI Debate Stage - Backend")
+    app = FastAPI(title="AI Debate Stage - Backend", lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.middleware("http")(record_http_metrics)
     app.include_router(routes.router, prefix="/v1")
+    app.include_router(routes.metrics_router)
     return app
 
-app = create_app()
\ No newline at end of file
+app = create_app()
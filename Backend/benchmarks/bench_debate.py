@@ -0,0 +1,135 @@
+"""End-to-end service benchmark with a fake LLM provider.
+
+    python -m benchmarks.bench_debate --debates 200 --concurrency 1,10,50 --latency 0.05 --rounds 3
+
+Drives the real FastAPI app from ``create_app`` in-process (create session, advance every
+turn, judge) and reports throughput, p50/p95/p99 latency per operation and memory held per
+finished session. ``--json`` writes the numbers to a file to diff against a saved baseline.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+import httpx
+from app.main import create_app
+from app.api.services.debate_manager import DebateManager, get_debate_manager
+from app.api.services.llm_client import get_llm_client
+from app.api.services.session_store import InMemorySessionStore
+from benchmarks.fake_llm import FakeLLMClient
+
+SESSION = {
+    "model_a": "ModelA",
+    "model_b": "ModelB",
+    "starting_turn": "ModelA",
+    "original_debate_topic": "Should remote work become the default for office jobs?",
+    "model_a_model": "gpt-4o-mini",
+    "model_b_model": "gpt-4o-mini",
+    "judge_model_model": "gpt-4o",
+}
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def build(latency: float, store_size: int):
+    llm = FakeLLMClient(latency=latency)
+    # no response cache at all: every fake debate has the same transcript, and even an empty
+    # cache would merge concurrent identical judge calls into one provider request
+    llm.cache = None
+    manager = DebateManager(store=InMemorySessionStore(max_sessions=store_size, ttl=0), llm=llm)
+    app = create_app()
+    app.dependency_overrides[get_llm_client] = lambda: llm
+    app.dependency_overrides[get_debate_manager] = lambda: manager
+    return app, manager
+
+async def run_level(debates: int, concurrency: int, latency: float, rounds: int) -> Dict:
+    app, _ = build(latency, store_size=debates)
+    timings: Dict[str, List[float]] = defaultdict(list)
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def call(op: str, method: str, url: str, **kwargs) -> Dict:
+            t0 = time.perf_counter()
+            r = await client.request(method, url, **kwargs)
+            timings[op].append(time.perf_counter() - t0)
+            r.raise_for_status()
+            return r.json()
+
+        async def debate():
+            async with gate:
+                created = await call("create", "POST", "/v1/debate/session", json={**SESSION, "max_rounds": rounds})
+                sid = created["session_id"]
+                for _ in range(2 * rounds):
+                    await call("advance", "POST", f"/v1/debate/session/{sid}/advance")
+                await call("judge", "POST", f"/v1/debate/session/{sid}/judge")
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(debate() for _ in range(debates)))
+        elapsed = time.perf_counter() - t0
+
+    requests = sum(len(v) for v in timings.values())
+    return {
+        "concurrency": concurrency,
+        "debates": debates,
+        "seconds": round(elapsed, 3),
+        "debates_per_s": round(debates / elapsed, 2),
+        "requests_per_s": round(requests / elapsed, 1),
+        "latency_ms": {
+            op: {f"p{int(q * 100)}": round(percentile(samples, q) * 1000, 2) for q in (0.5, 0.95, 0.99)}
+            for op, samples in timings.items()
+        },
+    }
+
+async def memory_per_session(sessions: int, rounds: int) -> float:
+    """Bytes retained per finished session (transcript and judge-ready state) in the memory store."""
+    _, manager = build(latency=0.0, store_size=sessions)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(sessions):
+        sid, _ = await manager.create_session(
+            model_a="ModelA", model_b="ModelB", starting_turn="ModelA", topic=SESSION["original_debate_topic"],
+            max_rounds=rounds, model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o",
+        )
+        for _ in range(2 * rounds):
+            await manager.advance_session(sid)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return grown / sessions
+
+async def main(args) -> None:
+    results = {"latency_s": args.latency, "rounds": args.rounds, "levels": []}
+    for concurrency in args.concurrency:
+        level = await run_level(args.debates, concurrency, args.latency, args.rounds)
+        results["levels"].append(level)
+        lat = level["latency_ms"]
+        print(
+            f"c={concurrency:<4} {level['debates_per_s']:>8} debates/s {level['requests_per_s']:>9} req/s  "
+            + "  ".join(f"{op} p50/p95/p99={v['p50']}/{v['p95']}/{v['p99']}ms" for op, v in lat.items())
+        )
+    results["bytes_per_session"] = round(await memory_per_session(args.memory_sessions, args.rounds))
+    print(f"memory: {results['bytes_per_session']} bytes per finished {args.rounds}-round session")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--debates", type=int, default=100, help="debates per concurrency level")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.0, help="fake provider latency per call (seconds)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--memory-sessions", type=int, default=500)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,58 @@
+"""Measure LLMClient throughput against the fake provider.
+
+    python -m benchmarks.bench_llm_client --requests 2000 --concurrency 200 --latency 0.05
+
+Starts the fake provider on a local port and drives ``LLMClient.generate``
+through the real HTTP stack, so connection pooling and keep-alive are exercised.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+import uvicorn
+from app.api.core.config import settings
+from app.api.services.llm_client import LLMClient
+from benchmarks.fake_provider import create_fake_provider
+
+async def run(requests: int, concurrency: int, latency: float, port: int) -> None:
+    server = uvicorn.Server(uvicorn.Config(create_fake_provider(latency=latency), port=port, log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    settings.openai_api_base = f"http://127.0.0.1:{port}/v1"
+    client = LLMClient()
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with gate:
+            t0 = time.perf_counter()
+            await client.generate("gpt-4o-mini", [{"role": "user", "content": "hi"}])
+            latencies.append(time.perf_counter() - t0)
+
+    try:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - t0
+    finally:
+        await client.aclose()
+        server.should_exit = True
+        await serve
+
+    latencies.sort()
+    print(f"requests={requests} concurrency={concurrency} provider_latency={latency}s")
+    print(f"throughput: {requests / elapsed:.1f} req/s")
+    print(f"p50={statistics.median(latencies) * 1000:.1f}ms p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=9011)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.latency, args.port))
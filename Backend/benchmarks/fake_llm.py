@@ -0,0 +1,47 @@
+"""In-process fake LLM client for measuring the service's own overhead.
+
+It keeps LLMClient's cache, rate limiting and retry layers but replaces the provider
+call with a deterministic reply after a configurable delay, so no HTTP is involved.
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional
+from app.api.services.llm_cache import LLMResponseCache
+from app.api.services.llm_client import LLMClient, LLMResult
+from app.api.services.context_policy import estimate_prompt_tokens
+
+class FakeLLMClient(LLMClient):
+    def __init__(self, latency: float = 0.0, reply: str = "Winner: ModelA\nReasoning: a deterministic fake turn.", cache: Optional[LLMResponseCache] = None):
+        super().__init__(cache=cache)
+        self.latency = latency
+        self.reply = reply
+        self.calls = 0
+
+    async def _call_provider(self, model: str, messages: List[Dict], temperature: float, max_tokens: int, schema: Optional[Dict] = None, prefix: int = 0) -> LLMResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # structured calls get the smallest reply that satisfies their schema
+        text = json.dumps(_sample(schema)) if schema else self.reply
+        return LLMResult(text=text, prompt_tokens=estimate_prompt_tokens(messages), completion_tokens=len(text) // 4 + 1)
+
+    async def stream(self, model: str, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 300, usage: Optional[Dict] = None, prefix: int = 0) -> AsyncIterator[str]:
+        result = await self._call_provider(model, messages, temperature, max_tokens)
+        if usage is not None:
+            usage.update(prompt_tokens=result.prompt_tokens, completion_tokens=result.completion_tokens)
+        for i, word in enumerate(result.text.split(" ")):
+            yield word if i == 0 else " " + word
+
+def _sample(schema: Dict):
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _sample(sub) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return []
+    if kind in ("number", "integer"):
+        return 5
+    if kind == "boolean":
+        return True
+    return "a deterministic fake value."
@@ -0,0 +1,133 @@
+"""Local fake LLM provider speaking the OpenAI chat-completions wire format.
+
+Serve it with uvicorn for real-socket benchmarks:
+
+    python -m benchmarks.fake_provider --port 9000 --latency 0.2
+    OPENAI_API_BASE=http://127.0.0.1:9000/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+or mount it in-process with ``httpx.ASGITransport(app=create_fake_provider())``.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from itertools import count
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+def create_fake_provider(latency: float = 0.0, reply: str = "This is a fake debate turn.", token_latency: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    """`latency` is the delay before the first byte, `token_latency` the delay between streamed words,
+    `error_rate` the fraction of calls answered with a 429.
+
+    Tests can also script individual calls through ``app.state``: ``fail_next`` calls get
+    ``fail_status``, and the next ``slow_next`` calls take ``slow_latency`` seconds.
+    """
+    app = FastAPI(title="Fake LLM provider")
+    # tests may swap the reply between calls
+    app.state.reply = reply
+    app.state.calls = 0
+    app.state.last_request = None
+    app.state.fail_next = 0
+    app.state.fail_status = 429
+    app.state.slow_next = 0
+    app.state.slow_latency = 0.0
+    # last messages seen per prompt_cache_key, to report prefix-cache hits like OpenAI does
+    app.state.prompt_cache = {}
+    ids = count(1)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        app.state.last_request = body
+        delay = latency
+        if app.state.slow_next > 0:
+            app.state.slow_next -= 1
+            delay = app.state.slow_latency
+        if delay:
+            await asyncio.sleep(delay)
+        if app.state.fail_next > 0 or (error_rate and random.random() < error_rate):
+            status = app.state.fail_status if app.state.fail_next > 0 else 429
+            app.state.fail_next = max(0, app.state.fail_next - 1)
+            return JSONResponse(
+                {"error": {"message": "fake provider error", "type": "rate_limit_error" if status == 429 else "server_error"}},
+                status_code=status,
+                headers={"retry-after": "0"},
+            )
+        messages = body.get("messages", [])
+        prompt_tokens = sum(_tokens(m) for m in messages)
+        cached_tokens = _cached_tokens(body.get("prompt_cache_key") or body.get("model", "fake"), messages)
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            chunks = _stream(body.get("model", "fake"), f"chatcmpl-fake-{next(ids)}", prompt_tokens if include_usage else None, cached_tokens)
+            return StreamingResponse(chunks, media_type="text/event-stream")
+        return {
+            "id": f"chatcmpl-fake-{next(ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": app.state.reply},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(prompt_tokens, cached_tokens),
+        }
+
+    def _cached_tokens(key: str, messages: list) -> int:
+        previous = app.state.prompt_cache.get(key, [])
+        app.state.prompt_cache[key] = messages
+        shared = 0
+        for old, new in zip(previous, messages):
+            if old != new:
+                break
+            shared += _tokens(new)
+        return shared
+
+    def _usage(prompt_tokens: int, cached_tokens: int = 0) -> dict:
+        completion_tokens = len(app.state.reply) // 4 + 1
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+
+    async def _stream(model: str, completion_id: str, prompt_tokens, cached_tokens: int = 0):
+        words = app.state.reply.split(" ")
+        for i, word in enumerate(words):
+            if i and token_latency:
+                await asyncio.sleep(token_latency)
+            delta = {"content": word if i == 0 else " " + word}
+            yield "data: " + json.dumps(_chunk(completion_id, model, delta, None)) + "\n\n"
+        yield "data: " + json.dumps(_chunk(completion_id, model, {}, "stop")) + "\n\n"
+        if prompt_tokens is not None:
+            yield "data: " + json.dumps({**_chunk(completion_id, model, {}, None), "choices": [], "usage": _usage(prompt_tokens, cached_tokens)}) + "\n\n"
+        yield "data: [DONE]\n\n"
+
+    return app
+
+def _tokens(message: dict) -> int:
+    return len(str(message.get("content", ""))) // 4 + 1
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason):
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each reply")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds between streamed words")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    args = parser.parse_args()
+    uvicorn.run(create_fake_provider(latency=args.latency, token_latency=args.token_latency, error_rate=args.error_rate), host=args.host, port=args.port, log_level="warning")
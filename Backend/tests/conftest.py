@@ -0,0 +1,58 @@
+import os
+
+# GPT calls need a key to be configured; the fake provider accepts any
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.api.core.config import settings
+from app.api.services.debate_manager import DebateManager, get_debate_manager
+from app.api.services.debate_runner import DebateRunner, get_debate_runner
+from app.api.services.llm_cache import LLMResponseCache
+from app.api.services.llm_client import LLMClient, get_llm_client
+from app.main import create_app
+from benchmarks.fake_provider import create_fake_provider
+
+@pytest.fixture
+def provider():
+    return create_fake_provider(reply="Fake turn.")
+
+@pytest.fixture
+def llm(monkeypatch, provider):
+    monkeypatch.setattr(settings, "openai_api_base", "http://fake/v1")
+    return LLMClient(http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=provider)), cache=LLMResponseCache())
+
+@pytest.fixture
+def manager(llm):
+    return DebateManager(llm=llm)
+
+@pytest.fixture
+def runner(manager):
+    return DebateRunner(manager, workers=2, queue_size=10)
+
+@pytest.fixture
+def client(llm, manager, runner):
+    app = create_app()
+    app.dependency_overrides[get_llm_client] = lambda: llm
+    app.dependency_overrides[get_debate_manager] = lambda: manager
+    app.dependency_overrides[get_debate_runner] = lambda: runner
+    with TestClient(app) as c:
+        yield c
+        c.portal.call(runner.stop)
+
+def new_session(client, **overrides):
+    payload = {
+        "model_a": "ModelA",
+        "model_b": "ModelB",
+        "starting_turn": "ModelA",
+        "original_debate_topic": "Is AI beneficial?",
+        "max_rounds": 2,
+        "model_a_model": "gpt-4o-mini",
+        "model_b_model": "gpt-4o-mini",
+        "judge_model_model": "gpt-4o-mini",
+    }
+    payload.update(overrides)
+    r = client.post("/v1/debate/session", json=payload)
+    assert r.status_code == 200, r.text
+    return r.json()["session_id"]
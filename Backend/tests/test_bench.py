@@ -0,0 +1,9 @@
+import pytest
+from benchmarks.bench_debate import memory_per_session, run_level
+
+@pytest.mark.asyncio
+async def test_benchmark_harness_smoke():
+    level = await run_level(debates=3, concurrency=2, latency=0.0, rounds=1)
+    assert level["debates"] == 3
+    assert set(level["latency_ms"]) == {"create", "advance", "judge"}
+    assert await memory_per_session(sessions=5, rounds=1) > 0
@@ -0,0 +1,46 @@
+import pytest
+from app.api.core.config import settings
+from app.api.services.context_policy import pending_summary, select_context
+from app.api.services.session_store import Turn
+
+def _statements(n):
+    return [Turn(speaker="AB"[i % 2], text=f"point {i}", round=i // 2 + 1) for i in range(n)]
+
+def test_select_context(monkeypatch):
+    monkeypatch.setattr(settings, "context_last_k", 2)
+    monkeypatch.setattr(settings, "context_token_budget", 15)
+    statements = _statements(5)
+    assert select_context(statements, "full") == statements
+    assert select_context(statements, "last_k") == statements[-2:]
+    # each statement costs 3 + 4 estimated tokens
+    assert select_context(statements, "token_budget") == statements[-2:]
+    assert select_context(statements, "summary", summarized=4) == statements[-1:]
+
+def test_summary_refreshes_once_per_round(monkeypatch):
+    monkeypatch.setattr(settings, "context_last_k", 2)
+    statements = _statements(4)
+    assert pending_summary(statements, "summary", 0) == statements[:2]
+    assert pending_summary(statements[:3], "summary", 0) is None
+    assert pending_summary(statements + _statements(1), "summary", 2) is None
+    assert pending_summary(statements, "last_k", 0) is None
+
+@pytest.mark.asyncio
+async def test_summary_policy_bounds_prompt(monkeypatch, manager, provider):
+    monkeypatch.setattr(settings, "context_last_k", 2)
+    session_id, _ = await manager.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=3,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", context_policy="summary",
+    )
+    for _ in range(6):
+        resp = await manager.advance_session(session_id)
+        assert resp.prompt_tokens > 0
+    # six turns plus one summary refresh at the start of round three
+    assert provider.state.calls == 7
+    contents = [m["content"] for m in provider.state.last_request["messages"]]
+    assert "Summary of the earlier debate: Fake turn." in contents
+    assert sum(c.startswith("(round ") for c in contents) == 3
+
+@pytest.mark.asyncio
+async def test_unknown_context_policy(manager):
+    with pytest.raises(ValueError):
+        await manager.create_session(model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=1, context_policy="everything")
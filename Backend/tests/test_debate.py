@@ -1,14 +1,18 @@
-import pytest
-from httpx import AsyncClient
-from app.main import create_app
+from conftest import new_session
 
-@pytest.mark.asyncio
-async def test_debate_endpoint():
-    app = create_app()
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        payload = {"topic": "Is AI beneficial?", "model_a": "A", "model_b": "B", "rounds": 2}
-        r = await ac.post("/v1/debate", json=payload)
+def test_debate_endpoint(client, provider):
+    session_id = new_session(client, model_a="A", model_b="B", starting_turn="A", max_rounds=2)
+    for _ in range(4):
+        r = client.post(f"/v1/debate/session/{session_id}/advance")
+        assert r.status_code == 200
+    assert r.json()["done"] is True
+
+    state = client.get(f"/v1/debate/session/{session_id}", params={"include_hints": False}).json()
+    assert state["done"] is True
+    assert len(state["transcript"]) == 4
+    assert [s["speaker"] for s in state["transcript"]] == ["A", "B", "A", "B"]
+
+    provider.state.reply = "Winner: A\nReasoning: clearer case."
+    r = client.post(f"/v1/debate/session/{session_id}/judge")
     assert r.status_code == 200
-    data = r.json()
-    assert data["topic"] == "Is AI beneficial?"
-    assert len(data["transcript"]) == 4
\ No newline at end of file
+    assert r.json()["winner"] == "A"
@@ -0,0 +1,33 @@
+from app.api.services.llm_cache import LLMResponseCache
+
+def test_key_depends_on_sampling_parameters():
+    messages = [{"role": "user", "content": "x"}]
+    base = LLMResponseCache.key("gpt-4", messages, 0.0, 100)
+    assert base == LLMResponseCache.key("gpt-4", [{"content": "x", "role": "user"}], 0.0, 100)
+    assert base != LLMResponseCache.key("gpt-4", messages, 0.0, 200)
+    assert base != LLMResponseCache.key("gpt-4o", messages, 0.0, 100)
+
+def test_memory_tier_is_lru_bounded():
+    cache = LLMResponseCache(max_entries=2, path=None)
+    for k in ("a", "b", "c"):
+        cache.put(k, {"text": k})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"text": "c"}
+    assert cache.stats()["memory_entries"] == 2
+
+def test_disk_tier_survives_restart_and_expires(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    LLMResponseCache(path=path).put("k", {"text": "v"})
+    fresh = LLMResponseCache(path=path)
+    assert fresh.get("k") == {"text": "v"}
+    assert fresh.stats()["disk_hits"] == 1
+
+    later = LLMResponseCache(path=path)
+    monkeypatch.setattr("app.api.services.llm_cache.time.time", lambda: 1e12)
+    assert later.get("k") is None
+
+def test_disk_tier_indexes_expiry(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.db"))
+    plan = cache._db.execute("EXPLAIN QUERY PLAN DELETE FROM llm_cache WHERE expires <= 0").fetchall()
+    assert "llm_cache_expires" in str(plan)
+    cache.close()
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import openai
+import pytest
+from app.api.core.config import settings
+from app.api.services.llm_cache import LLMResponseCache
+from app.api.services.llm_client import LLMClient
+from app.api.services.rate_limit import TokenBucket
+
+@pytest.mark.asyncio
+async def test_openai_client_is_reused(llm, provider):
+    messages = [{"role": "user", "content": "hi"}]
+    assert await llm.generate("gpt-4o-mini", messages) == "Fake turn."
+    first = llm._openai
+    assert await llm.generate("gpt-4o-mini", messages) == "Fake turn."
+    assert llm._openai is first
+    assert provider.state.calls == 2
+    await llm.aclose()
+    assert llm._openai is None
+
+@pytest.mark.asyncio
+async def test_aclose_closes_owned_cache(monkeypatch, tmp_path):
+    class DiskCache(LLMResponseCache):
+        def __init__(self):
+            super().__init__(path=str(tmp_path / "cache.db"))
+
+    monkeypatch.setattr("app.api.services.llm_client.LLMResponseCache", DiskCache)
+    owned, injected = LLMClient(), LLMClient(cache=DiskCache())
+    await owned.aclose()
+    await injected.aclose()
+    assert owned.cache.stats()["disk_enabled"] is False
+    assert injected.cache.stats()["disk_enabled"] is True
+    injected.cache.close()
+
+@pytest.mark.asyncio
+async def test_stream_yields_deltas(llm):
+    chunks = [c async for c in llm.stream("gpt-4o-mini", [{"role": "user", "content": "hi"}])]
+    assert chunks == ["Fake", " turn."]
+
+@pytest.mark.asyncio
+async def test_deterministic_calls_are_cached(llm, provider):
+    messages = [{"role": "user", "content": "judge this"}]
+    first = await llm.generate_with_usage("gpt-4o-mini", messages, temperature=0.0)
+    second = await llm.generate_with_usage("gpt-4o-mini", messages, temperature=0.0)
+    assert (first.cached, second.cached) == (False, True)
+    assert second.text == first.text
+    assert provider.state.calls == 1
+
+    await llm.generate("gpt-4o-mini", messages, temperature=0.7)
+    await llm.generate("gpt-4o-mini", messages, temperature=0.7)
+    assert provider.state.calls == 3
+    await llm.generate("gpt-4o-mini", messages, temperature=0.7, cache=True)
+    await llm.generate("gpt-4o-mini", messages, temperature=0.7, cache=True)
+    assert provider.state.calls == 4
+    assert llm.cache.stats()["hits"] == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_request(llm, provider):
+    messages = [{"role": "user", "content": "same"}]
+    results = await asyncio.gather(*(llm.generate("gpt-4o-mini", messages, temperature=0.0) for _ in range(5)))
+    assert set(results) == {"Fake turn."}
+    assert provider.state.calls == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_request(llm, provider):
+    provider.state.slow_next = 1
+    provider.state.slow_latency = 0.2
+    messages = [{"role": "user", "content": "shared"}]
+    leader = asyncio.create_task(llm.generate("gpt-4o-mini", messages, temperature=0.0))
+    await asyncio.sleep(0.05)
+    follower = asyncio.create_task(llm.generate("gpt-4o-mini", messages, temperature=0.0))
+    await asyncio.sleep(0.05)
+    leader.cancel()
+    assert await follower == "Fake turn."
+    assert leader.cancelled()
+    assert provider.state.calls == 1
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "llm_retry_base_delay", 0.001)
+    monkeypatch.setattr(settings, "llm_max_retries", 3)
+
+@pytest.mark.asyncio
+async def test_retries_rate_limited_calls(llm, provider, fast_retries):
+    provider.state.fail_next = 2
+    assert await llm.generate("gpt-4o-mini", [{"role": "user", "content": "hi"}]) == "Fake turn."
+    assert provider.state.calls == 3
+
+@pytest.mark.asyncio
+async def test_gives_up_on_client_errors(llm, provider, fast_retries):
+    provider.state.fail_next = 1
+    provider.state.fail_status = 400
+    with pytest.raises(openai.BadRequestError):
+        await llm.generate("gpt-4o-mini", [{"role": "user", "content": "hi"}])
+    assert provider.state.calls == 1
+
+@pytest.mark.asyncio
+async def test_attempt_timeout_is_retried(llm, provider, fast_retries, monkeypatch):
+    monkeypatch.setattr(settings, "llm_attempt_timeout", 0.2)
+    provider.state.slow_next = 1
+    provider.state.slow_latency = 5
+    assert await llm.generate("gpt-4o-mini", [{"role": "user", "content": "hi"}]) == "Fake turn."
+    assert provider.state.calls == 2
+
+@pytest.mark.asyncio
+async def test_hedges_slow_calls(llm, provider, monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge", True)
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 5)
+    for _ in range(5):
+        llm._tracker("gpt-4o-mini").observe(0.01)
+    provider.state.slow_next = 1
+    provider.state.slow_latency = 5
+    started = time.monotonic()
+    assert await llm.generate("gpt-4o-mini", [{"role": "user", "content": "hi"}]) == "Fake turn."
+    assert time.monotonic() - started < 1
+    assert provider.state.calls == 2
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_requests():
+    bucket = TokenBucket(per_minute=600, capacity=1)
+    await bucket.acquire()
+    assert not bucket.try_acquire()
+    started = time.monotonic()
+    await bucket.acquire()
+    assert 0.05 < time.monotonic() - started < 0.5
+
+class StubGemini:
+    """Records what would be sent to the Gemini API."""
+
+    def __init__(self):
+        self.requests = []
+        self.cache_configs = []
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(generate_content=self._generate_content),
+            caches=SimpleNamespace(create=self._create_cache),
+        )
+
+    async def _generate_content(self, model, contents, config):
+        self.requests.append((contents, config))
+        return SimpleNamespace(text=" Gemini turn. ", usage_metadata=SimpleNamespace(prompt_token_count=12, candidates_token_count=3))
+
+    async def _create_cache(self, model, config):
+        self.cache_configs.append(config)
+        return SimpleNamespace(name=f"cachedContents/{len(self.cache_configs)}")
+
+@pytest.fixture
+def gemini(llm):
+    stub = StubGemini()
+    llm.gemini_key = "fake"
+    llm._gemini = stub
+    return stub
+
+DEBATE = [
+    {"role": "system", "content": "You are ModelA."},
+    {"role": "user", "content": "Topic: cats"},
+    {"role": "user", "content": "(round 1)ModelB: dogs"},
+    {"role": "assistant", "content": "cats"},
+]
+
+@pytest.mark.asyncio
+async def test_gemini_gets_roles_and_generation_config(llm, gemini):
+    result = await llm.generate_with_usage("gemini-2.0-flash", DEBATE, temperature=0.3, max_tokens=64)
+    assert (result.text, result.prompt_tokens, result.completion_tokens) == ("Gemini turn.", 12, 3)
+    contents, config = gemini.requests[0]
+    assert [c.role for c in contents] == ["user", "model"]
+    assert [p.text for p in contents[0].parts] == ["Topic: cats", "(round 1)ModelB: dogs"]
+    assert config.system_instruction == "You are ModelA."
+    assert (config.temperature, config.max_output_tokens) == (0.3, 64)
+    assert config.cached_content is None
+
+@pytest.mark.asyncio
+async def test_gemini_caches_stable_prefix(llm, gemini, monkeypatch):
+    monkeypatch.setattr(settings, "gemini_context_cache", True)
+    monkeypatch.setattr(settings, "gemini_cache_min_tokens", 0)
+    for reply in ("cats", "still cats"):
+        await llm.generate("gemini-2.0-flash", DEBATE[:3] + [{"role": "assistant", "content": reply}], prefix=2)
+    assert len(gemini.cache_configs) == 1
+    assert gemini.cache_configs[0].system_instruction == "You are ModelA."
+    for contents, config in gemini.requests:
+        assert config.cached_content == "cachedContents/1"
+        assert config.system_instruction is None
+        assert [c.role for c in contents] == ["user", "model"]
+
+    monkeypatch.setattr(settings, "gemini_cache_min_tokens", 10_000)
+    await llm.generate("gemini-2.0-flash", DEBATE, prefix=2)
+    assert gemini.requests[-1][1].cached_content is None
@@ -0,0 +1,47 @@
+from app.api.core import metrics
+from conftest import new_session
+
+
+def test_trace_reports_phase_timings(client):
+    session_id = new_session(client)
+    r = client.post(f"/v1/debate/session/{session_id}/advance", params={"trace": True})
+    assert r.status_code == 200
+    timings = r.json()["timings"]
+    for phase in ("load", "prompt_build", "llm_queue", "provider", "commit", "serialize"):
+        assert phase in timings
+    assert "provider;dur=" in r.headers["Server-Timing"]
+
+    r = client.post(f"/v1/debate/session/{session_id}/advance")
+    assert r.json()["timings"] is None
+    assert "Server-Timing" not in r.headers
+
+
+def test_metrics_endpoint(client):
+    session_id = new_session(client)
+    client.post(f"/v1/debate/session/{session_id}/advance")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'debate_llm_request_seconds_count{provider="openai",model="gpt-4o-mini"}' in body
+    assert 'route="/v1/debate/session/{session_id}/advance"' in body
+    assert "debate_active_sessions" in body
+
+
+def test_histogram_render():
+    h = metrics.Histogram("test_seconds", "help", ("op",), buckets=(0.1, 1.0, float("inf")))
+    h.labels("a").observe(0.5)
+    lines = h.render()
+    assert 'test_seconds_bucket{op="a",le="0.1"} 0' in lines
+    assert 'test_seconds_bucket{op="a",le="1"} 1' in lines
+    assert 'test_seconds_bucket{op="a",le="+Inf"} 1' in lines
+    assert 'test_seconds_count{op="a"} 1' in lines
+
+
+def test_errors_counted_on_every_endpoint(client):
+    errors = metrics.ERRORS.labels("ValueError")
+    before = errors.value
+    session_id = new_session(client)
+    assert client.post(f"/v1/debate/session/{session_id}/judge", json={"judge_models": ["gpt-99"]}).status_code == 400
+    assert client.post("/v1/debate/session", json={"model_a": "A", "model_b": "B", "starting_turn": "C", "original_debate_topic": "t"}).status_code == 400
+    assert errors.value == before + 2
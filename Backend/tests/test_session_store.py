@@ -0,0 +1,124 @@
+from uuid import uuid4
+import pytest
+from app.api.services.session_store import InMemorySessionStore, SessionConflict, SessionRecord, SQLiteSessionStore, Turn, create_session_store
+from app.api.v1.schemas import Statement
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemorySessionStore()
+    else:
+        s = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        yield s
+        s.close()
+
+def record(**fields) -> SessionRecord:
+    return SessionRecord(**{"model_a": "A", "model_b": "B", "topic": "t", "current_turn": "A", "max_rounds": 3, **fields})
+
+def test_roundtrip(store):
+    sid = uuid4()
+    store.create(sid, record())
+    store.append(sid, [Turn(speaker="A", round=1, text="one")])
+    store.append(sid, [Turn(speaker="B", round=1, text="two")])
+    store.update(sid, current_round=2, current_turn="A")
+
+    session = store.get(sid)
+    assert session.topic == "t"
+    assert session.current_round == 2
+    assert [s.text for s in session.transcript] == ["one", "two"]
+
+    with pytest.raises(AttributeError):
+        store.update(sid, hint="not a field")
+
+    store.delete(sid)
+    with pytest.raises(KeyError):
+        store.get(sid)
+
+def test_get_page(store):
+    sid = uuid4()
+    store.create(sid, record())
+    store.append(sid, [Turn(speaker="A", round=i // 2 + 1, text=str(i)) for i in range(6)])
+
+    session, page, next_cursor, total = store.get_page(sid, cursor=1, limit=2)
+    assert session.topic == "t"
+    assert [s.text for s in page] == ["1", "2"]
+    assert (next_cursor, total) == (3, 6)
+
+    _, page, next_cursor, _ = store.get_page(sid, since_round=3)
+    assert [s.text for s in page] == ["4", "5"]
+    assert next_cursor == 6
+
+    _, page, next_cursor, _ = store.get_page(sid, cursor=6)
+    assert page == [] and next_cursor == 6
+
+    # a zero limit skips nothing
+    _, page, next_cursor, _ = store.get_page(sid, cursor=2, limit=0)
+    assert page == [] and next_cursor == 2
+
+def test_commit_turn_is_refused_when_stale(store):
+    sid = uuid4()
+    store.create(sid, record())
+    store.commit_turn(sid, Turn(speaker="A", round=1, text="one"), 0, current_turn="B")
+    # a second writer that read the session before that commit
+    with pytest.raises(SessionConflict):
+        store.commit_turn(sid, Turn(speaker="A", round=1, text="again"), 0, current_turn="B")
+    session = store.get(sid)
+    assert [t.text for t in session.transcript] == ["one"]
+    assert session.current_turn == "B"
+
+def test_unknown_session(store):
+    with pytest.raises(KeyError):
+        store.append(uuid4(), [Turn(speaker="A", round=1, text="x")])
+
+def test_sqlite_shared_between_connections(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    sid = uuid4()
+    first.create(sid, record())
+    first.append(sid, [Turn(speaker="A", round=1, text="one")])
+    assert second.get(sid).transcript[0].text == "one"
+
+def test_sqlite_reads_keep_sessions_alive(tmp_path, monkeypatch):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=10)
+    sid = uuid4()
+    now = [1000.0]
+    monkeypatch.setattr("app.api.services.session_store.time.time", lambda: now[0])
+    store.create(sid, record())
+    for _ in range(3):
+        now[0] += 8
+        store.get_page(sid, limit=0)
+    assert store.get(sid).topic == "t"
+    now[0] += 11
+    with pytest.raises(KeyError):
+        store.get(sid)
+
+def test_memory_store_evicts_lru():
+    store = InMemorySessionStore(max_sessions=2)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    store.create(a, record())
+    store.create(b, record())
+    store.get(a)
+    store.create(c, record())
+    assert len(store) == 2
+    with pytest.raises(KeyError):
+        store.get(b)
+    store.get(a)
+
+def test_memory_store_expires_idle_sessions(monkeypatch):
+    store = InMemorySessionStore(ttl=10)
+    sid = uuid4()
+    store.create(sid, record())
+    monkeypatch.setattr("app.api.services.session_store.time.monotonic", lambda: 1e12)
+    with pytest.raises(KeyError):
+        store.get(sid)
+
+def test_turn_renders_prefix_once():
+    turn = Turn(speaker="A", round=2, text="hello")
+    st = turn.render()
+    assert st == Statement(speaker="A", text="(round 2)A: hello", round=2)
+    assert Turn.from_statement(st) == turn
+    assert Turn.from_statement(Statement(speaker="A", text="bare", round=1)).text == "bare"
+
+def test_unsupported_store_url():
+    with pytest.raises(ValueError):
+        create_session_store("redis://localhost:6379/0")
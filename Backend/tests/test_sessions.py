@@ -0,0 +1,210 @@
+import json
+from conftest import new_session
+
+def _events(body: str):
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        yield event[len("event: "):], json.loads(data[len("data: "):])
+
+def test_advance_stream_emits_tokens_then_turn(client):
+    session_id = new_session(client)
+    r = client.post(f"/v1/debate/session/{session_id}/advance/stream")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = list(_events(r.text))
+    assert [e for e, _ in events] == ["token", "token", "turn"]
+    assert "".join(d["text"] for e, d in events if e == "token") == "Fake turn."
+    turn = events[-1][1]
+    assert turn["next_turn"] == "ModelB"
+    assert turn["updated_conversation"][0]["text"] == "(round 1)ModelA: Fake turn."
+
+    state = client.get(f"/v1/debate/session/{session_id}").json()
+    assert state["current_turn"] == "ModelB"
+
+def test_advance_stream_unknown_session(client):
+    r = client.post("/v1/debate/session/00000000-0000-0000-0000-000000000000/advance/stream")
+    assert r.status_code == 404
+
+def test_run_to_completion(client):
+    session_id = new_session(client)
+    r = client.post(f"/v1/debate/session/{session_id}/run")
+    assert r.status_code == 202
+    assert r.json()["status"] in ("queued", "running")
+
+    events = [d for e, d in _events(client.get(f"/v1/debate/session/{session_id}/run/events").text)]
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["turns_completed"] == 4
+
+    status = client.get(f"/v1/debate/session/{session_id}/run").json()
+    assert status["done"] is True
+    assert status["judge"]["reasoning"] == "Fake turn."
+    assert client.get(f"/v1/debate/session/{session_id}").json()["done"] is True
+
+def test_finished_runs_are_not_kept_by_the_runner(client, runner):
+    session_id = new_session(client)
+    client.post(f"/v1/debate/session/{session_id}/run")
+    list(_events(client.get(f"/v1/debate/session/{session_id}/run/events").text))
+    assert runner._jobs == {}
+    assert client.get(f"/v1/debate/session/{session_id}/run").json()["status"] == "completed"
+
+    client.delete(f"/v1/debate/session/{session_id}")
+    assert client.get(f"/v1/debate/session/{session_id}/run").status_code == 404
+
+    # deleting a session mid-run drops its job too
+    session_id = new_session(client)
+    client.post(f"/v1/debate/session/{session_id}/run")
+    client.delete(f"/v1/debate/session/{session_id}")
+    assert runner._jobs == {}
+
+def test_delete_session(client):
+    session_id = new_session(client)
+    assert client.delete(f"/v1/debate/session/{session_id}").status_code == 204
+    assert client.get(f"/v1/debate/session/{session_id}").status_code == 404
+
+def test_advance_returns_delta_after_cursor(client):
+    session_id = new_session(client)
+    first = client.post(f"/v1/debate/session/{session_id}/advance").json()
+    assert first["cursor"] == 1
+    assert [s["speaker"] for s in first["updated_conversation"]] == ["ModelA", "__system_hint__"]
+
+    second = client.post(
+        f"/v1/debate/session/{session_id}/advance",
+        params={"cursor": first["cursor"], "include_hints": False},
+    ).json()
+    assert second["cursor"] == 2
+    assert [s["text"] for s in second["updated_conversation"]] == ["(round 1)ModelB: Fake turn."]
+
+def test_session_state_pagination(client):
+    session_id = new_session(client)
+    for _ in range(4):
+        client.post(f"/v1/debate/session/{session_id}/advance")
+    url = f"/v1/debate/session/{session_id}"
+
+    full = client.get(url).json()
+    assert len(full["transcript"]) == 5
+    assert full["transcript"][-1]["speaker"] == "__system_hint__"
+
+    page = client.get(url, params={"limit": 3}).json()
+    assert [s["round"] for s in page["transcript"]] == [1, 1, 2]
+    assert page["cursor"] == 3
+    rest = client.get(url, params={"cursor": page["cursor"], "include_hints": False}).json()
+    assert [s["round"] for s in rest["transcript"]] == [2]
+    assert rest["cursor"] == 4
+
+    empty = client.get(url, params={"limit": 0}).json()
+    assert (empty["transcript"], empty["cursor"]) == ([], 0)
+
+    since = client.get(url, params={"since_round": 2, "include_hints": False}).json()
+    assert [s["speaker"] for s in since["transcript"]] == ["ModelA", "ModelB"]
+
+JUDGES = ["gpt-4", "gpt-4o", "gpt-4o-mini"]
+
+def test_judge_panel_tolerates_failures(client, provider):
+    session_id = new_session(client)
+    provider.state.reply = "Winner: ModelA\nReasoning: sharper rebuttals."
+    provider.state.fail_next = 1
+    provider.state.fail_status = 400
+    r = client.post(f"/v1/debate/session/{session_id}/judge", json={"judge_models": JUDGES})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["winner"] == "ModelA"
+    assert data["scores"] == {"ModelA": 1.0}
+    assert [v["judge_model"] for v in data["panel"]] == JUDGES
+    assert sum(v["error"] is not None for v in data["panel"]) == 1
+
+def test_judge_panel_timeout(client, provider):
+    session_id = new_session(client)
+    provider.state.reply = "Winner: ModelB\nReasoning: more evidence."
+    provider.state.slow_next = 1
+    provider.state.slow_latency = 5
+    data = client.post(f"/v1/debate/session/{session_id}/judge", json={"judge_models": JUDGES, "timeout": 0.5}).json()
+    assert data["winner"] == "ModelB"
+    assert [v["error"] for v in data["panel"]].count("timed out") == 1
+
+def test_single_judge_reports_vote(client, provider):
+    session_id = new_session(client)
+    provider.state.reply = "Winner: ModelB\nReasoning: more evidence."
+    data = client.post(f"/v1/debate/session/{session_id}/judge").json()
+    assert data["winner"] == "ModelB"
+    assert data["reasoning"] == "Reasoning: more evidence."
+    assert data["scores"] == {"ModelB": 1.0}
+
+def test_judge_structured_verdict(client, provider):
+    session_id = new_session(client)
+    scores = {"ModelA": 6, "ModelB": 8}
+    provider.state.reply = json.dumps({
+        "winner": "modelb",
+        "criteria": {"argument_strength": scores, "rebuttal": scores, "evidence": scores, "persuasiveness": scores},
+        "reasoning": "better evidence",
+    })
+    calls = provider.state.calls
+    data = client.post(f"/v1/debate/session/{session_id}/judge").json()
+    assert provider.state.calls == calls + 1
+    assert data["winner"] == "ModelB"
+    assert data["reasoning"] == "better evidence"
+    assert data["criteria"]["evidence"] == {"ModelA": 6, "ModelB": 8}
+    response_format = provider.state.last_request["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["schema"]["properties"]["winner"]["enum"] == ["ModelA", "ModelB", "Tie"]
+
+def test_judge_repairs_malformed_output_once(client, provider):
+    session_id = new_session(client)
+    provider.state.reply = '{"winner": "Nobody"}'
+    calls = provider.state.calls
+    data = client.post(f"/v1/debate/session/{session_id}/judge").json()
+    assert provider.state.calls == calls + 2
+    assert data["winner"] is None
+    assert "not a valid verdict" in provider.state.last_request["messages"][-1]["content"]
+
+    # neither bad reply was cached, so judging again asks the provider again
+    provider.state.reply = "Winner: ModelA\nReasoning: clearer."
+    data = client.post(f"/v1/debate/session/{session_id}/judge").json()
+    assert provider.state.calls == calls + 3
+    assert data["winner"] == "ModelA"
+
+def test_stateless_turn(client, provider):
+    payload = {
+        "model_a": "ModelA",
+        "model_b": "ModelB",
+        "current_turn": "ModelB",
+        "original_debate_topic": "Is AI beneficial?",
+        "previous_conversation": [
+            {"speaker": "ModelA", "text": "(round 1)ModelA: AI cures diseases.", "round": 1},
+            {"speaker": "__system_hint__", "text": "[You are ModelB] ...", "round": 1},
+        ],
+        "current_round": 1,
+        "max_rounds": 1,
+        "model_a_model": "gpt-4o-mini",
+        "model_b_model": "gpt-4o-mini",
+    }
+    r = client.post("/v1/debate/turn", json=payload)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["updated_conversation"] == [{"speaker": "ModelB", "text": "(round 1)ModelB: Fake turn.", "round": 1}]
+    assert (data["next_turn"], data["current_round"], data["done"]) == ("ModelA", 2, True)
+
+    messages = provider.state.last_request["messages"]
+    # the opponent's reply goes in the per-turn tail, not the cacheable prefix
+    assert "AI cures diseases." not in messages[0]["content"]
+    assert "AI cures diseases." in messages[-1]["content"]
+    assert not any("__system_hint__" in m["content"] for m in messages)
+
+def test_turns_share_a_cacheable_prefix(client, provider):
+    session_id = new_session(client)
+    first = client.post(f"/v1/debate/session/{session_id}/advance").json()
+    second = client.post(f"/v1/debate/session/{session_id}/advance").json()
+    third = client.post(f"/v1/debate/session/{session_id}/advance").json()
+    assert first["cached_tokens"] == 0
+    # ModelB's first prompt has its own prefix; ModelA's second reuses the first one's
+    assert second["cached_tokens"] == 0
+    request = provider.state.last_request
+    system, topic = request["messages"][:2]
+    assert third["cached_tokens"] >= len(system["content"]) // 4 + len(topic["content"]) // 4 + 2
+    assert system["content"].startswith("You are ModelA.")
+    assert len(request["prompt_cache_key"]) == 32
+
+def test_stateless_turn_rejects_unknown_speaker(client):
+    r = client.post("/v1/debate/turn", json={
+        "model_a": "ModelA", "model_b": "ModelB", "current_turn": "ModelC", "original_debate_topic": "t",
+    })
+    assert r.status_code == 400
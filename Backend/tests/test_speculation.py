@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from app.api.core.config import settings
+
+async def create(manager, speculate=True):
+    session_id, _ = await manager.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=2,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o-mini",
+        speculate=speculate,
+    )
+    return session_id
+
+async def settle(manager, session_id):
+    spec = manager._speculative.get(session_id)
+    if spec is not None:
+        await asyncio.wait({spec.task})
+
+@pytest.mark.asyncio
+async def test_next_turn_is_pregenerated_and_served(manager, provider):
+    session_id = await create(manager)
+    await manager.advance_session(session_id)
+    await settle(manager, session_id)
+    assert provider.state.calls == 2
+
+    provider.state.reply = "Generated too late."
+    resp = await manager.advance_session(session_id)
+    assert resp.updated_conversation[1].text == "(round 1)B: Fake turn."
+    # serving it started the speculation for the turn after
+    await settle(manager, session_id)
+    assert provider.state.calls == 3
+
+    for _ in range(2):
+        resp = await manager.advance_session(session_id)
+    assert resp.done and session_id not in manager._speculative
+
+@pytest.mark.asyncio
+async def test_speculation_is_opt_in(manager, provider):
+    session_id = await create(manager, speculate=False)
+    await manager.advance_session(session_id)
+    assert session_id not in manager._speculative
+    assert provider.state.calls == 1
+
+@pytest.mark.asyncio
+async def test_judging_or_deleting_cancels_speculation(manager, provider):
+    provider.state.slow_latency = 5
+    session_id = await create(manager)
+    await manager.advance_session(session_id)
+    # the background call has not reached the provider yet; make it hang there
+    provider.state.slow_next = 1
+    task = manager._speculative[session_id].task
+    await asyncio.sleep(0.05)
+    assert not task.done()
+    await manager.evaluate_session(session_id)
+    await asyncio.sleep(0)
+    assert task.cancelled() and session_id not in manager._speculative
+
+    await manager.advance_session(session_id)
+    provider.state.slow_next = 1
+    task = manager._speculative[session_id].task
+    await manager.delete_session(session_id)
+    await asyncio.sleep(0)
+    assert task.cancelled() and not manager._speculative
+
+@pytest.mark.asyncio
+async def test_idle_speculation_expires(manager, monkeypatch):
+    monkeypatch.setattr(settings, "speculative_ttl", 0.05)
+    session_id = await create(manager)
+    await manager.advance_session(session_id)
+    assert session_id in manager._speculative
+    await asyncio.sleep(0.1)
+    assert session_id not in manager._speculative
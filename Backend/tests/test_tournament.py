@@ -0,0 +1,57 @@
+import json
+from app.api.services.tournament import Leaderboard
+
+def test_leaderboard_elo_and_win_rate():
+    board = Leaderboard()
+    board.record("gpt-4o", "gpt-4o-mini", "gpt-4o")
+    board.record("gpt-4o", "gpt-4o-mini", "Tie")
+    top, bottom = board.entries()
+    assert top.model == "gpt-4o"
+    assert (top.wins, top.ties, top.losses, top.games) == (1, 1, 0, 2)
+    assert top.win_rate == 0.75
+    assert top.elo > 1000 > bottom.elo
+    assert round(top.elo + bottom.elo) == 2000
+
+def _tournament(**overrides):
+    payload = {
+        "topics": ["Is AI beneficial?", "Should cities ban cars?"],
+        "pairings": [{"model_a_model": "gpt-4o", "model_b_model": "gpt-4o-mini"}],
+        "max_rounds": 1,
+        "swap_sides": True,
+        "judge_model_model": "gpt-4o-mini",
+    }
+    payload.update(overrides)
+    return payload
+
+def test_tournament_leaderboard(client, provider, manager):
+    provider.state.reply = "Winner: ModelA\nReasoning: stronger opening."
+    r = client.post("/v1/tournament", json=_tournament())
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert len(data["matches"]) == 4
+    assert all(m["error"] is None and m["session_id"] is None for m in data["matches"])
+    # judged matches don't stay in the session store
+    assert manager._store.count() == 0
+    # side A always wins, and each model plays side A twice
+    assert {e["model"]: (e["wins"], e["losses"]) for e in data["leaderboard"]} == {"gpt-4o": (2, 2), "gpt-4o-mini": (2, 2)}
+
+def test_tournament_keeps_sessions_on_request(client, manager):
+    data = client.post("/v1/tournament", json=_tournament(keep_sessions=True)).json()
+    assert manager._store.count() == 4
+    session_id = data["matches"][0]["session_id"]
+    assert client.get(f"/v1/debate/session/{session_id}").json()["done"] is True
+
+def test_tournament_streams_matches(client):
+    r = client.post("/v1/tournament", params={"stream": "true"}, json=_tournament(swap_sides=False))
+    events = [block.split("\n", 1) for block in r.text.strip().split("\n\n")]
+    assert [e for e, _ in events] == ["event: match", "event: match", "event: leaderboard"]
+    match = json.loads(events[0][1][len("data: "):])
+    assert match["winner"] is None  # "Fake turn." is not a verdict
+
+def test_tournament_validates_limits(client):
+    assert client.post("/v1/tournament", json=_tournament(concurrency=-1)).status_code == 422
+    assert client.post("/v1/tournament", params={"stream": "true"}, json=_tournament(max_rounds=0)).status_code == 422
+
+def test_tournament_rejects_unknown_models(client):
+    r = client.post("/v1/tournament", json=_tournament(pairings=[{"model_a_model": "gpt-99", "model_b_model": "gpt-4o"}]))
+    assert r.status_code == 400
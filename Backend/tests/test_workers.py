@@ -0,0 +1,141 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.api.core.config import settings
+from app.api.services.debate_manager import DebateManager, get_debate_manager
+from app.api.services.debate_runner import DebateRunner, get_debate_runner
+from app.api.services.llm_client import get_llm_client
+from app.api.services.session_store import SQLiteSessionStore, create_session_store
+from app.api.v1.schemas import RunStatusResponse
+from app.main import create_app
+
+def test_import_needs_no_api_keys():
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "GEMINI_API_KEY", "GOOGLE_API_KEY")}
+    code = "import app.main, app.api.services.debate_manager as m; assert m._singleton is None"
+    subprocess.run([sys.executable, "-c", code], check=True, env=env, cwd=os.path.dirname(os.path.dirname(__file__)))
+
+def test_memory_store_refused_for_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    with pytest.raises(ValueError):
+        create_session_store("memory://")
+
+@pytest.mark.asyncio
+async def test_run_status_visible_from_another_worker(llm, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    second = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    session_id, _ = await first.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=1,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o-mini",
+    )
+    owner, other = DebateRunner(first, workers=1), DebateRunner(second, workers=1)
+    try:
+        await owner.submit(session_id)
+        # a second worker sees the queued run instead of starting its own
+        assert (await other.submit(session_id)).status in ("queued", "running")
+        updates = [job async for job in other.subscribe(session_id)]
+        assert updates[-1].status == "completed"
+        assert updates[-1].turns_completed == 2
+        assert (await other.status(session_id)).judge is not None
+    finally:
+        await owner.stop()
+        await other.stop()
+
+@pytest.mark.asyncio
+async def test_run_of_a_dead_worker_expires(llm, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    second = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    session_id, _ = await first.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=1,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o-mini",
+    )
+    # a worker that saved "running" and was then killed
+    await first.save_run(session_id, RunStatusResponse(session_id=session_id, status="running", current_round=1), owner="dead", lease=0.05)
+    other = DebateRunner(second, workers=1)
+    try:
+        assert (await other.status(session_id)).status == "running"
+        await asyncio.sleep(0.1)
+        assert (await other.status(session_id)).status == "failed"
+        assert "dead" in (await other.status(session_id)).error
+        # the expired run can be started again
+        assert (await other.submit(session_id)).status == "queued"
+        updates = [job async for job in other.subscribe(session_id)]
+        assert updates[-1].status == "completed"
+    finally:
+        await other.stop()
+
+@pytest.mark.asyncio
+async def test_live_runs_renew_their_lease(llm, provider, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    second = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    session_id, _ = await first.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=1,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o-mini",
+    )
+    provider.state.slow_next = 1
+    provider.state.slow_latency = 0.3
+    owner = DebateRunner(first, workers=1, lease=0.06)
+    try:
+        await owner.submit(session_id)
+        await asyncio.sleep(0.2)
+        assert (await second.get_run(session_id)).status == "running"
+    finally:
+        await owner.stop()
+
+@pytest.mark.asyncio
+async def test_following_a_remote_run_ends_when_the_session_is_deleted(llm, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.api.services.debate_runner.REMOTE_POLL_INTERVAL", 0.01)
+    manager = DebateManager(store=SQLiteSessionStore(str(tmp_path / "sessions.db")), llm=llm)
+    session_id, _ = await manager.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=1,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o-mini",
+    )
+    await manager.save_run(session_id, RunStatusResponse(session_id=session_id, status="running", current_round=1), owner="elsewhere", lease=60)
+    follow = DebateRunner(manager, workers=1).subscribe(session_id)
+    assert (await anext(follow)).status == "running"
+    await manager.delete_session(session_id)
+    last = await anext(follow)
+    assert (last.status, last.error) == ("failed", "session deleted")
+
+@pytest.mark.asyncio
+async def test_sqlite_lock_waits_off_the_event_loop(llm, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    manager = DebateManager(store=SQLiteSessionStore(path), llm=llm)
+    # another worker holding the write lock
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    create = asyncio.create_task(manager.create_session(
+        model_a="A", model_b="B", starting_turn="A", topic="t", max_rounds=1,
+        model_a_model="gpt-4o-mini", model_b_model="gpt-4o-mini", judge_model_model="gpt-4o-mini",
+    ))
+    started = time.monotonic()
+    await asyncio.sleep(0.1)
+    # the loop kept running while the write waited for the lock
+    assert time.monotonic() - started < 0.5
+    assert not create.done()
+    blocker.execute("COMMIT")
+    session_id, _ = await create
+    assert (await manager.get_session_state(session_id))["done"] is False
+    manager.close()
+
+def test_each_lifespan_builds_fresh_services(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "session_store_url", f"sqlite:///{tmp_path / 'sessions.db'}")
+    runners = []
+    for _ in range(2):
+        with TestClient(create_app()):
+            runner = get_debate_runner()
+            # the runner drives the manager of this lifespan, not one closed by the last
+            assert runner._manager is get_debate_manager()
+            assert runner._manager._store.count() == 0
+            # and it talks to this lifespan's LLM client
+            assert runner._manager._llm is get_llm_client()
+            runners.append(runner)
+    assert runners[0] is not runners[1]
+    assert runners[0]._manager._llm is not runners[1]._manager._llm